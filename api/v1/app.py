@@ -2,6 +2,7 @@
 """ flask app that integrates with AirBnB """
 from flask import Flask, make_response, jsonify
 from flask_cors import CORS
+from werkzeug.exceptions import HTTPException
 from models import storage
 from api.v1.views import app_views
 
@@ -18,7 +19,9 @@ def teardown(exc):
 
 @app.errorhandler(Exception)
 def handle_404_error(err):
-    """ handles 404 error """
+    """ handles 404 error, and the other HTTP errors with their status """
+    if isinstance(err, HTTPException) and err.code != 404:
+        return jsonify({"error": err.description}), err.code
     return jsonify({"error": "Not found"}), 404
 
 if __name__ == '__main__':
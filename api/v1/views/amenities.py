@@ -4,9 +4,13 @@ from flask import jsonify, request, abort
 from models import storage
 from models.amenity import Amenity
 from api.v1.views import app_views
+from api.v1.views.cache import cached
+from api.v1.views.conditional import object_response
+from api.v1.views.paging import listing
 
 
 @app_views.route('/amenities', methods=['GET', 'POST'])
+@cached('Amenity')
 def amenities():
     """
     Retrieves a list of amenities or creates a new amenity.
@@ -25,8 +29,7 @@ def amenities():
         - 400 Bad Request: If the request is not a valid JSON or if the 'name' field is missing.
     """
     if request.method == 'GET':
-        amenities_list = storage.all(Amenity).values()
-        return jsonify([amenity.to_dict() for amenity in amenities_list])
+        return listing(Amenity)
 
     elif request.method == 'POST':
         data = request.get_json()
@@ -68,7 +71,7 @@ def amenity_list(amenity_id):
         abort(404)
 
     if request.method == 'GET':
-        return jsonify(amenity.to_dict())
+        return object_response(amenity)
 
     elif request.method == 'PUT':
         data = request.get_json()
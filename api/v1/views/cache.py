@@ -0,0 +1,216 @@
+#!/usr/bin/python3
+"""Caches the responses of the read endpoints until storage changes them"""
+from collections import OrderedDict
+from flask import Response, request
+from functools import wraps
+import models
+from models import storage
+from os import getenv
+import threading
+
+
+class ResponseCache:
+    """LRU cache of responses, each one dropped as soon as storage tells
+    of a change to the objects it was read from"""
+
+    def __init__(self, size, entry_size=1024 ** 2):
+        """Instantiate a ResponseCache of at most size responses, each of
+        at most entry_size bytes"""
+        self.__lock = threading.Lock()
+        # integer - number of responses kept, 0 to keep none
+        self.__size = size
+        # integer - bytes of the largest body kept
+        self.__entry_size = entry_size
+        # OrderedDict - (body, status, headers, depends, versions) by key,
+        # the least recently used first
+        self.__entries = OrderedDict()
+        # dictionary - keys of the entries depending on every class, by
+        # class name, then by (attribute, id), or None for any object
+        self.__depends = {}
+        # integer - number of invalidations so far, to tell if one
+        # happened while a response was being made
+        self.__invalidations = 0
+        # integer - number of responses found in the cache
+        self.__hits = 0
+        # integer - number of responses made for lack of one in the cache
+        self.__misses = 0
+        # integer - number of responses dropped to make room
+        self.__evictions = 0
+
+    def get(self, key, versions=None):
+        """returns a new Response from the entry under key, or None when
+        there is none or it was put with other versions, which it is then
+        dropped for"""
+        with self.__lock:
+            entry = self.__entries.get(key)
+            if entry is not None and entry[4] != versions:
+                self._drop(key)
+                entry = None
+            if entry is None:
+                self.__misses += 1
+                return None
+            self.__entries.move_to_end(key)
+            self.__hits += 1
+        body, status, headers, depends, versions = entry
+        return Response(body, status, headers)
+
+    def invalidations(self):
+        """returns the number of invalidations so far, to be read before
+        making a response to put()"""
+        with self.__lock:
+            return self.__invalidations
+
+    def put(self, key, response, depends, invalidations, versions=None):
+        """wraps the body of response so that it is kept under key once
+        sent, unless it is too large or there were invalidations since
+        their number was invalidations, when the response was started
+
+        depends lists the (<class name>, attribute, id) the response was
+        read from, with None as attribute and id for any object of the
+        class. versions is what get() must be given for the response to
+        be found, the versions of the classes read before it was made.
+        """
+        if self.__size <= 0:
+            return response
+        body = response.iter_encoded()
+
+        def tee():
+            """yields the body, gathering it"""
+            chunks = []
+            size = 0
+            for chunk in body:
+                yield chunk
+                if chunks is not None:
+                    chunks.append(chunk)
+                    size += len(chunk)
+                    if size > self.__entry_size:
+                        chunks = None
+            if chunks is not None:
+                self._store(key, (b"".join(chunks), response.status_code,
+                                  response.headers.to_wsgi_list(),
+                                  depends, versions), invalidations)
+        response.response = tee()
+        return response
+
+    def _store(self, key, entry, invalidations):
+        """keeps entry under key, unless there were invalidations since
+        their number was invalidations"""
+        with self.__lock:
+            if invalidations != self.__invalidations:
+                return
+            self._drop(key)
+            self.__entries[key] = entry
+            for name, attr, id in entry[3]:
+                self.__depends.setdefault(name, {}).setdefault(
+                    None if attr is None else (attr, id), set()).add(key)
+            while len(self.__entries) > self.__size:
+                self._drop(next(iter(self.__entries)))
+                self.__evictions += 1
+
+    def _drop(self, key):
+        """removes the entry under key, if any"""
+        entry = self.__entries.pop(key, None)
+        if entry is None:
+            return
+        for name, attr, id in entry[3]:
+            by_parent = self.__depends[name]
+            parent = None if attr is None else (attr, id)
+            by_parent[parent].discard(key)
+            if not by_parent[parent]:
+                del by_parent[parent]
+
+    def invalidate(self, name, parents):
+        """drops the entries read from the objects of class name that had
+        or have one of the (attribute, id) pairs of parents, or from any
+        object of the class when parents is None"""
+        with self.__lock:
+            self.__invalidations += 1
+            by_parent = self.__depends.get(name)
+            if not by_parent:
+                return
+            if parents is None:
+                parents = list(by_parent)
+            else:
+                parents = [None] + list(parents)
+            keys = set()
+            for parent in parents:
+                keys.update(by_parent.get(parent, ()))
+            for key in keys:
+                self._drop(key)
+
+    def clear(self):
+        """drops every entry"""
+        with self.__lock:
+            self.__invalidations += 1
+            self.__entries.clear()
+            self.__depends.clear()
+
+    def stats(self):
+        """returns a dictionary of the size, hits, misses and evictions of
+        the cache"""
+        with self.__lock:
+            lookups = self.__hits + self.__misses
+            return {"entries": len(self.__entries),
+                    "size": self.__size,
+                    "hits": self.__hits,
+                    "misses": self.__misses,
+                    "hit_ratio": self.__hits / lookups if lookups else 0.0,
+                    "evictions": self.__evictions,
+                    "invalidations": self.__invalidations}
+
+
+cache = ResponseCache(int(getenv('HBNB_API_CACHE_SIZE', 1024)))
+storage.subscribe(cache.invalidate)
+
+
+def cached(*depends):
+    """
+    Cache the GET responses of a view until storage changes the objects
+    they were read from.
+
+    Storage tells of the changes it makes or reads from the file, which
+    drop the responses read from the objects changed. With a database,
+    it is not told of the commits of other processes, such as other
+    workers or the console: a hit then also compares the generation() of
+    the classes read with the ones the response was made under, so that
+    any change to a class drops the responses read from it.
+
+    Args:
+        depends: The class names the view reads any object of, or
+            (<class name>, attribute, <view argument>) for the objects
+            whose attribute equals the value of the view argument.
+
+    Returns:
+        The decorator of the view.
+    """
+    names = sorted(set([spec if isinstance(spec, str) else spec[0]
+                        for spec in depends]))
+
+    def decorator(view):
+        """wraps view"""
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            """answers from the cache, or calls view and keeps its
+            response"""
+            if request.method != 'GET':
+                return view(*args, **kwargs)
+            key = (request.path, tuple(sorted(request.args.items(True))),
+                   request.headers.get('Accept', ''))
+            versions = None
+            if models.storage_t == 'db':
+                versions = tuple([storage.generation(name)[0]
+                                  for name in names])
+            response = cache.get(key, versions)
+            if response is not None:
+                return response.make_conditional(request)
+            invalidations = cache.invalidations()
+            response = view(*args, **kwargs)
+            if not isinstance(response, Response) or \
+               response.status_code != 200:
+                return response
+            return cache.put(key, response, [
+                (spec, None, None) if isinstance(spec, str) else
+                (spec[0], spec[1], kwargs[spec[2]]) for spec in depends],
+                invalidations, versions)
+        return wrapper
+    return decorator
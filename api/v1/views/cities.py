@@ -5,9 +5,13 @@ from models import storage
 from models.city import City
 from models.state import State
 from api.v1.views import app_views
+from api.v1.views.cache import cached
+from api.v1.views.conditional import object_response
+from api.v1.views.paging import listing
 
 
 @app_views.route('/states/<state_id>/cities', methods=['GET', 'POST'])
+@cached(('City', 'state_id', 'state_id'), ('State', 'id', 'state_id'))
 def cities(state_id):
     """
     Retrieves the list of cities or creates a new city for a given state.
@@ -26,14 +30,11 @@ def cities(state_id):
         400: If the request method is POST and the request data is not in JSON format,
              or if the request data is missing the 'name' field.
     """
-    state = storage.get(State, state_id)
-    if not state:
+    if not storage.exists(State, state_id):
         abort(404)
 
     if request.method == 'GET':
-        cities_list = storage.all(City).values()
-        state_cities = [city.to_dict() for city in cities_list if city.state_id == state_id]
-        return jsonify(state_cities)
+        return listing(City, state_id=state_id)
 
     elif request.method == 'POST':
         data = request.get_json()
@@ -71,7 +72,7 @@ def city_list(city_id):
         abort(404)
 
     if request.method == 'GET':
-        return jsonify(city.to_dict())
+        return object_response(city)
 
     elif request.method == 'PUT':
         data = request.get_json()
@@ -97,5 +98,4 @@ def get_cities():
     Returns:
         A JSON response containing a list of dictionaries, where each dictionary represents a city.
     """
-    cities_list = storage.all(City).values()
-    return jsonify([city.to_dict() for city in cities_list])
+    return listing(City)
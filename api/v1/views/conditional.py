@@ -0,0 +1,57 @@
+#!/usr/bin/python3
+"""Answers conditional GETs with 304 Not Modified"""
+from datetime import datetime, timezone
+from flask import Response, jsonify, request
+from models.base_model import time
+
+
+def conditional(etag, modified, build):
+    """
+    Answer with 304 Not Modified when the client already holds the
+    version etag, without calling build().
+
+    If-None-Match is checked when the request has it, and
+    If-Modified-Since otherwise, as HTTP wants. HTTP dates drop the
+    fractions of seconds, so a change made in the current second has no
+    Last-Modified: another change later in that second would get the
+    same date, and clients holding it would wrongly be told 304.
+
+    Args:
+        etag (str): The version of the resource.
+        modified (datetime): When the resource last changed, in UTC, or
+            None when it is not known.
+        build (callable): Makes the response when it is needed.
+
+    Returns:
+        The 304 response, or the one made by build(), with the ETag and
+        Last-Modified headers set.
+    """
+    if modified is not None:
+        modified = modified.replace(microsecond=0, tzinfo=timezone.utc)
+        if modified >= datetime.now(timezone.utc).replace(microsecond=0):
+            modified = None
+    if request.if_none_match:
+        fresh = request.if_none_match.contains_weak(etag)
+    else:
+        fresh = (modified is not None and
+                 request.if_modified_since is not None and
+                 modified <= request.if_modified_since)
+    response = Response(status=304) if fresh else build()
+    response.set_etag(etag)
+    if modified is not None:
+        response.last_modified = modified
+    return response
+
+
+def object_response(obj):
+    """
+    Answer a GET of obj, versioned by its id and updated_at.
+
+    Args:
+        obj (BaseModel): The object asked for.
+
+    Returns:
+        A JSON response containing the object, or 304 Not Modified.
+    """
+    etag = "{}.{}".format(obj.id, obj.updated_at.strftime(time))
+    return conditional(etag, obj.updated_at, lambda: jsonify(obj.to_dict()))
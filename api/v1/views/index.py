@@ -1,6 +1,7 @@
 #!/usr/bin/python3
 """flask route """
 from api.v1.views import app_views
+from api.v1.views.cache import cache, cached
 from flask import jsonify, request
 from models import storage
 
@@ -11,6 +12,7 @@ def status():
     return jsonify(statok)
 
 @app_views.route('/stats', methods=['GET'])
+@cached('Amenity', 'City', 'Place', 'Review', 'State', 'User')
 def stats():
     """ function to return the count of all class objects """
     if request.method == 'GET':
@@ -23,6 +25,13 @@ def stats():
             "State": "states",
             "User": "users"
         }
+        counts = storage.counts()
         for key, value in PLURALS.items():
-            response[value] = storage.count(key)
+            response[value] = counts.get(key, 0)
         return jsonify(response)
+
+
+@app_views.route('/cache_stats', methods=['GET'])
+def cache_stats():
+    """ returns the hits, misses and size of the response cache """
+    return jsonify(cache.stats())
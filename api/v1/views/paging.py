@@ -0,0 +1,150 @@
+#!/usr/bin/python3
+"""Lists the objects of a class, streamed or one page at a time"""
+import base64
+import binascii
+from api.v1.views.conditional import conditional
+from datetime import datetime
+from flask import Response, abort, current_app, jsonify, request, \
+    stream_with_context
+import json
+from models import storage
+from models.base_model import time
+
+# integer - objects in a page when the request gives a cursor but no limit
+default_limit = 100
+# integer - largest number of objects a page may hold
+max_limit = 1000
+# integer - characters of JSON gathered before a streamed chunk is sent
+chunk_size = 64 * 1024
+
+
+def encode_cursor(position):
+    """
+    Turn a (created_at, id) position given by storage.page() into a cursor.
+
+    Args:
+        position (tuple): The position of the last object of a page.
+
+    Returns:
+        str: The cursor, safe to put in a query string.
+    """
+    text = json.dumps(list(position)).encode()
+    return base64.urlsafe_b64encode(text).decode()
+
+
+def decode_cursor(cursor):
+    """
+    Turn a cursor made by encode_cursor() back into a position.
+
+    Args:
+        cursor (str): The cursor given in the query string.
+
+    Returns:
+        tuple: The (created_at, id) position.
+
+    Raises:
+        400: If the cursor was not made by encode_cursor().
+    """
+    try:
+        position = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (binascii.Error, ValueError):
+        abort(400, 'Invalid cursor')
+    if not isinstance(position, list) or len(position) != 2 or \
+       not all([isinstance(value, str) for value in position]):
+        abort(400, 'Invalid cursor')
+    try:
+        datetime.strptime(position[0], time)
+    except ValueError:
+        abort(400, 'Invalid cursor')
+    return tuple(position)
+
+
+def stream(objs, ndjson=False):
+    """
+    Serialize objs as they come, without holding them all in memory.
+
+    Args:
+        objs (iterable): The objects to serialize.
+        ndjson (bool): Write one JSON object per line instead of an array.
+
+    Yields:
+        str: Pieces of the JSON array, or lines, of about chunk_size.
+    """
+    chunk = [] if ndjson else ["["]
+    size = 0
+    separator = ""
+    for obj in objs:
+        text = current_app.json.dumps(obj.to_dict())
+        if ndjson:
+            text += "\n"
+        else:
+            text = separator + text
+            separator = ","
+        chunk.append(text)
+        size += len(text)
+        if size >= chunk_size:
+            yield "".join(chunk)
+            chunk = []
+            size = 0
+    if not ndjson:
+        chunk.append("]\n")
+    yield "".join(chunk)
+
+
+def listing(cls, **criteria):
+    """
+    List the objects of cls whose attributes match criteria.
+
+    Without 'limit' nor 'cursor' in the query string, the response is
+    the array of every object, streamed from storage.iter() so that
+    neither the objects nor the JSON are all held in memory, or one
+    object per line when the client accepts application/x-ndjson
+    rather than application/json. Otherwise it is an object holding the
+    page under 'results', at most 'limit' objects in the order of
+    (created_at, id), and under 'next' the cursor to pass to get the
+    following page, or null on the last page.
+
+    The response is versioned by storage.generation(cls), so that a
+    client holding the current version gets 304 Not Modified before any
+    object is read.
+
+    Args:
+        cls (class): The class of the objects to list.
+
+    Returns:
+        A JSON response containing the objects or the page.
+
+    Raises:
+        400: If the limit is not a positive integer or the cursor is
+        invalid.
+    """
+    generation, modified = storage.generation(cls)
+    if 'limit' not in request.args and 'cursor' not in request.args:
+        mimetype = request.accept_mimetypes.best_match(
+            ['application/json', 'application/x-ndjson'], 'application/json')
+
+        def build():
+            """streams the objects"""
+            objs = storage.iter(cls, **criteria)
+            return Response(stream_with_context(stream(
+                objs, mimetype == 'application/x-ndjson')),
+                mimetype=mimetype)
+        etag = "{}.{}".format(generation, mimetype)
+        response = conditional(etag, modified, build)
+        response.vary.add('Accept')
+        return response
+    limit = request.args.get('limit', str(default_limit))
+    if not limit.isdigit() or int(limit) < 1:
+        abort(400, 'Invalid limit')
+    limit = int(limit)
+    after = None
+    if request.args.get('cursor'):
+        after = decode_cursor(request.args['cursor'])
+
+    def build():
+        """reads the page"""
+        objs, last = storage.page(cls, min(limit, max_limit), after,
+                                  **criteria)
+        return jsonify({"results": [obj.to_dict() for obj in objs],
+                        "next": encode_cursor(last) if last else None})
+    return conditional(generation, modified, build)
@@ -1,16 +1,16 @@
 #!/usr/bin/python3
 """This is a place handler"""
-from flask import Flask, Blueprint, jsonify, abort, request
+from flask import jsonify, abort, request
+from api.v1.views import app_views
+from api.v1.views.conditional import object_response
+from api.v1.views.paging import listing
 from models import storage
 from models.city import City
 from models.place import Place
 from models.user import User
 
-app = Flask(__name__)
-places_api = Blueprint('places_api', __name__)
 
-
-@places_api.route('/api/v1/cities/<city_id>/places', methods=['GET'])
+@app_views.route('/cities/<city_id>/places', methods=['GET'])
 def get_city_places(city_id):
     """
     Retrieves all places associated with a specific city.
@@ -24,14 +24,12 @@ def get_city_places(city_id):
     Raises:
         404: If the city with the given ID does not exist.
     """
-    city = storage.get(City, city_id)
-    if not city:
+    if not storage.exists(City, city_id):
         abort(404)
-    places = [place.to_dict() for place in city.places]
-    return jsonify(places)
+    return listing(Place, city_id=city_id)
 
 
-@places_api.route('/api/v1/places/<place_id>', methods=['GET'])
+@app_views.route('/places/<place_id>', methods=['GET'])
 def get_place(place_id):
     """
     Retrieve a specific place by its ID.
@@ -48,10 +46,10 @@ def get_place(place_id):
     place = storage.get(Place, place_id)
     if not place:
         abort(404)
-    return jsonify(place.to_dict())
+    return object_response(place)
 
 
-@places_api.route('/api/v1/places/<place_id>', methods=['DELETE'])
+@app_views.route('/places/<place_id>', methods=['DELETE'])
 def delete_place(place_id):
     """
     Delete a place by its ID.
@@ -73,7 +71,7 @@ def delete_place(place_id):
     return jsonify({}), 200
 
 
-@places_api.route('/api/v1/cities/<city_id>/places', methods=['POST'])
+@app_views.route('/cities/<city_id>/places', methods=['POST'])
 def create_place(city_id):
     """
     Create a new place in a city.
@@ -88,8 +86,7 @@ def create_place(city_id):
         404: If the city with the given ID does not exist.
         400: If the request is not in JSON format, or if the 'user_id' or 'name' fields are missing.
     """
-    city = storage.get(City, city_id)
-    if not city:
+    if not storage.exists(City, city_id):
         abort(404)
     if not request.json:
         abort(400, 'Not a JSON')
@@ -98,17 +95,18 @@ def create_place(city_id):
     if 'name' not in request.json:
         abort(400, 'Missing name')
     user_id = request.json['user_id']
-    user = storage.get(User, user_id)
-    if not user:
-        abort(404)
     data = request.json
     data['city_id'] = city_id
-    place = Place(**data)
-    place.save()
+    with storage.transaction():
+        if not storage.exists(City, city_id) or \
+           not storage.exists(User, user_id):
+            abort(404)
+        place = Place(**data)
+        place.save()
     return jsonify(place.to_dict()), 201
 
 
-@places_api.route('/api/v1/places/<place_id>', methods=['PUT'])
+@app_views.route('/places/<place_id>', methods=['PUT'])
 def update_place(place_id):
     """
     Update a place with the given place_id.
@@ -131,3 +129,37 @@ def update_place(place_id):
     place.save()
     return jsonify(place.to_dict()), 200
 
+
+@app_views.route('/places_search', methods=['POST'])
+def places_search():
+    """
+    Search places by states, cities and amenities.
+
+    The JSON body may hold lists of ids under 'states', 'cities' and
+    'amenities'. The places returned are those of the cities listed and
+    of every city of the states listed, or all places when both lists are
+    empty, keeping only the ones that have all the amenities listed.
+
+    Returns:
+        A JSON response containing the list of places found.
+
+    Raises:
+        400: If the request is not in JSON format, or if one of the
+        fields is not a list of string ids.
+    """
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        abort(400, 'Not a JSON')
+    lists = {}
+    for field in ('states', 'cities', 'amenities'):
+        lists[field] = data.get(field) or []
+        if not isinstance(lists[field], list):
+            abort(400, 'Not a list: {}'.format(field))
+        if not all([isinstance(id, str) for id in lists[field]]):
+            abort(400, 'Not a list of ids: {}'.format(field))
+    places = []
+    for place in storage.places_search(**lists):
+        place = place.to_dict()
+        place.pop('amenities', None)
+        places.append(place)
+    return jsonify(places)
@@ -1,16 +1,16 @@
 #!/usr/bin/python3
 """This is the review controls"""
-from flask import Flask, Blueprint, jsonify, abort, request
+from flask import jsonify, abort, request
+from api.v1.views import app_views
+from api.v1.views.conditional import object_response
+from api.v1.views.paging import listing
 from models import storage
 from models.place import Place
 from models.review import Review
 from models.user import User
 
-app = Flask(__name__)
-places_reviews_api = Blueprint('places_reviews_api', __name__)
 
-
-@places_reviews_api.route('/api/v1/places/<place_id>/reviews', methods=['GET'])
+@app_views.route('/places/<place_id>/reviews', methods=['GET'])
 def get_place_reviews(place_id):
     """
     Retrieve all reviews for a specific place.
@@ -24,14 +24,12 @@ def get_place_reviews(place_id):
     Raises:
         404: If the place with the given ID does not exist.
     """
-    place = storage.get(Place, place_id)
-    if not place:
+    if not storage.exists(Place, place_id):
         abort(404)
-    reviews = [review.to_dict() for review in place.reviews]
-    return jsonify(reviews)
+    return listing(Review, place_id=place_id)
 
 
-@places_reviews_api.route('/api/v1/reviews/<review_id>', methods=['GET'])
+@app_views.route('/reviews/<review_id>', methods=['GET'])
 def get_review(review_id):
     """
     Retrieve a specific review by its ID.
@@ -48,10 +46,10 @@ def get_review(review_id):
     review = storage.get(Review, review_id)
     if not review:
         abort(404)
-    return jsonify(review.to_dict())
+    return object_response(review)
 
 
-@places_reviews_api.route('/api/v1/reviews/<review_id>', methods=['DELETE'])
+@app_views.route('/reviews/<review_id>', methods=['DELETE'])
 def delete_review(review_id):
     """
     Delete a review by its ID.
@@ -73,7 +71,7 @@ def delete_review(review_id):
     return jsonify({}), 200
 
 
-@places_reviews_api.route('/api/v1/places/<place_id>/reviews', methods=['POST'])
+@app_views.route('/places/<place_id>/reviews', methods=['POST'])
 def create_review(place_id):
     """
     Create a new review for a place.
@@ -89,8 +87,7 @@ def create_review(place_id):
         400: If the request is not in JSON format, or if the 'user_id' or 'text' fields are missing.
 
     """
-    place = storage.get(Place, place_id)
-    if not place:
+    if not storage.exists(Place, place_id):
         abort(404)
     if not request.json:
         abort(400, 'Not a JSON')
@@ -99,17 +96,18 @@ def create_review(place_id):
     if 'text' not in request.json:
         abort(400, 'Missing text')
     user_id = request.json['user_id']
-    user = storage.get(User, user_id)
-    if not user:
-        abort(404)
     data = request.json
     data['place_id'] = place_id
-    review = Review(**data)
-    review.save()
+    with storage.transaction():
+        if not storage.exists(Place, place_id) or \
+           not storage.exists(User, user_id):
+            abort(404)
+        review = Review(**data)
+        review.save()
     return jsonify(review.to_dict()), 201
 
 
-@places_reviews_api.route('/api/v1/reviews/<review_id>', methods=['PUT'])
+@app_views.route('/reviews/<review_id>', methods=['PUT'])
 def update_review(review_id):
     """
     Update a review by its ID.
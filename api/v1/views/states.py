@@ -4,9 +4,13 @@ from flask import Flask, jsonify, request, abort
 from models import storage
 from models.state import State
 from api.v1.views import app_views
+from api.v1.views.cache import cached
+from api.v1.views.conditional import object_response
+from api.v1.views.paging import listing
 
 
 @app_views.route('/states', methods=['GET', 'POST'])
+@cached('State')
 def states():
     """
     Retrieves the list of all State objects or creates a new State object
@@ -18,8 +22,7 @@ def states():
         JSON representation of the State object(s) or an error message
     """
     if request.method == 'GET':
-        states = storage.all(State).values()
-        return jsonify([state.to_dict() for state in states])
+        return listing(State)
 
     elif request.method == 'POST':
         data = request.get_json()
@@ -29,6 +32,7 @@ def states():
             abort(400, 'Missing name')
         new_state = State(**data)
         new_state.save()
+        return jsonify(new_state.to_dict()), 201
 
 
 @app_views.route('/states/<state_id>', methods=['GET', 'PUT', 'DELETE'])
@@ -51,7 +55,7 @@ def state(state_id):
         abort(404)
 
     if request.method == 'GET':
-        return jsonify(state.to_dict())
+        return object_response(state)
 
     elif request.method == 'PUT':
         data = request.get_json()
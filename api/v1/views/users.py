@@ -1,14 +1,14 @@
 #!/usr/bin/python3
 """This is the user handler"""
-from flask import Flask, Blueprint, jsonify, abort, request
+from flask import jsonify, abort, request
+from api.v1.views import app_views
+from api.v1.views.conditional import object_response
+from api.v1.views.paging import listing
 from models import storage
 from models.user import User
 
-app = Flask(__name__)
-users_api = Blueprint('users_api', __name__)
 
-
-@users_api.route('/api/v1/users', methods=['GET'])
+@app_views.route('/users', methods=['GET'])
 def get_users():
     """
     Retrieve all users from the database and return them as a JSON response.
@@ -16,11 +16,10 @@ def get_users():
     Returns:
         A JSON response containing a list of dictionaries, where each dictionary represents a user.
     """
-    users = storage.all(User).values()
-    return jsonify([user.to_dict() for user in users])
+    return listing(User)
 
 
-@users_api.route('/api/v1/users/<user_id>', methods=['GET'])
+@app_views.route('/users/<user_id>', methods=['GET'])
 def get_user(user_id):
     """
     Retrieve a user by their ID.
@@ -37,10 +36,10 @@ def get_user(user_id):
     user = storage.get(User, user_id)
     if not user:
         abort(404)
-    return jsonify(user.to_dict())
+    return object_response(user)
 
 
-@users_api.route('/api/v1/users/<user_id>', methods=['DELETE'])
+@app_views.route('/users/<user_id>', methods=['DELETE'])
 def delete_user(user_id):
     """
     Delete a user by their ID.
@@ -62,7 +61,7 @@ def delete_user(user_id):
     return jsonify({}), 200
 
 
-@users_api.route('/api/v1/users', methods=['POST'])
+@app_views.route('/users', methods=['POST'])
 def create_user():
     """
     Create a new user.
@@ -92,7 +91,7 @@ def create_user():
     return jsonify(user.to_dict()), 201
 
 
-@users_api.route('/api/v1/users/<user_id>', methods=['PUT'])
+@app_views.route('/users/<user_id>', methods=['PUT'])
 def update_user(user_id):
     """
     Update a user with the given user_id.
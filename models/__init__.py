@@ -3,15 +3,12 @@
 initialize the models package
 """
 
+from models import engine
 from os import getenv
 
 
-storage_t = getenv("HBNB_TYPE_STORAGE")
+storage_name = getenv("HBNB_TYPE_STORAGE")
+storage_t = engine.kind(storage_name)
 
-if storage_t == "db":
-    from models.engine.db_storage import DBStorage
-    storage = DBStorage()
-else:
-    from models.engine.file_storage import FileStorage
-    storage = FileStorage()
+storage = engine.load(storage_name)()
 storage.reload()
@@ -8,10 +8,27 @@ import models
 from os import getenv
 import sqlalchemy
 from sqlalchemy import Column, String, DateTime
+from sqlalchemy.dialects import mysql
 from sqlalchemy.ext.declarative import declarative_base
 import uuid
 
 time = "%Y-%m-%dT%H:%M:%S.%f"
+# the dates keep their microseconds in MySQL too
+DATETIME = DateTime().with_variant(mysql.DATETIME(fsp=6), "mysql")
+
+
+def parse_dates(values):
+    """returns a copy of the dictionary values with the created_at and
+    updated_at strings, as to_dict() writes them, turned into datetimes,
+    and raises ValueError if one is neither such a string nor a datetime"""
+    values = dict(values)
+    for attr in ("created_at", "updated_at"):
+        if isinstance(values.get(attr), str):
+            values[attr] = datetime.strptime(values[attr], time)
+        elif attr in values and not isinstance(values[attr], datetime):
+            raise ValueError("{} must be a date".format(attr))
+    return values
+
 
 if models.storage_t == "db":
     Base = declarative_base()
@@ -23,8 +40,8 @@ class BaseModel:
     """The BaseModel class from which future classes will be derived"""
     if models.storage_t == "db":
         id = Column(String(60), primary_key=True)
-        created_at = Column(DateTime, default=datetime.utcnow)
-        updated_at = Column(DateTime, default=datetime.utcnow)
+        created_at = Column(DATETIME, default=datetime.utcnow, index=True)
+        updated_at = Column(DATETIME, default=datetime.utcnow, index=True)
 
     def __init__(self, *args, **kwargs):
         """Initialization of the base model"""
@@ -47,16 +64,26 @@ class BaseModel:
             self.created_at = datetime.utcnow()
             self.updated_at = self.created_at
 
+    if models.storage_t != "db":
+        def __setattr__(self, name, value):
+            """sets the attribute and tells the storage, so that it writes
+            the change at the next save() if self is one of its objects"""
+            super().__setattr__(name, value)
+            touch = getattr(getattr(models, "storage", None), "touch", None)
+            if touch is not None:
+                touch(self)
+
     def __str__(self):
         """String representation of the BaseModel class"""
         return "[{:s}] ({:s}) {}".format(self.__class__.__name__, self.id,
                                          self.__dict__)
 
     def save(self):
-        """updates the attribute 'updated_at' with the current datetime"""
+        """updates the attribute 'updated_at' with the current datetime
+        and returns what the save() of the storage returns"""
         self.updated_at = datetime.utcnow()
         models.storage.new(self)
-        models.storage.save()
+        return models.storage.save()
 
     def to_dict(self):
         """returns a dictionary containing all keys/values of the instance"""
@@ -0,0 +1,33 @@
+#!/usr/bin/python3
+"""
+Contains the registry of the storage engines HBNB_TYPE_STORAGE picks from
+
+The modules of the engines are only imported once one is picked, since
+the models need to know the kind of storage before they are defined.
+"""
+
+from importlib import import_module
+
+# dictionary - (module, class name, kind) of every engine by name, the
+# kind being "db" for the engines mapping the models with SQLAlchemy
+engines = {"file": ("models.engine.file_storage", "FileStorage", "file"),
+           "db": ("models.engine.db_storage", "DBStorage", "db"),
+           "sqlite": ("models.engine.sqlite_storage", "SQLiteStorage", "db")}
+# string - engine used when HBNB_TYPE_STORAGE names none of them
+default = "file"
+
+
+def register(name, module, class_name, kind="db"):
+    """makes the class class_name of module selectable as name"""
+    engines[name] = (module, class_name, kind)
+
+
+def kind(name):
+    """returns the kind of the engine selected by name"""
+    return engines.get(name, engines[default])[2]
+
+
+def load(name):
+    """imports and returns the class of the engine selected by name"""
+    module, class_name, _ = engines.get(name, engines[default])
+    return getattr(import_module(module), class_name)
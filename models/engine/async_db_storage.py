@@ -0,0 +1,128 @@
+#!/usr/bin/python3
+"""
+Contains the class AsyncDBStorage
+
+It needs SQLAlchemy's asyncio extension (pip install sqlalchemy[asyncio]),
+an asyncio MySQL driver such as aiomysql, and the models mapped to their
+tables, that is HBNB_TYPE_STORAGE set to an engine of the "db" kind.
+"""
+
+import asyncio
+from models.engine.db_storage import classes, _eager, _seed, \
+    _versioned, _where
+from models.engine.pool import pool_options
+from os import getenv
+import sqlalchemy
+from sqlalchemy.ext.asyncio import async_scoped_session, \
+    async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session
+
+
+class _Session(Session):
+    """the session doing the work of the AsyncSession of a task, which
+    bumps the generations of the classes it changes as DBStorage does"""
+
+
+sqlalchemy.event.listen(_Session, "before_flush", _versioned)
+
+
+class AsyncDBStorage:
+    """interacts with the MySQL database without blocking the event loop"""
+    __engine = None
+    __session = None
+
+    def __init__(self):
+        """Instantiate an AsyncDBStorage object"""
+        self.__engine = create_async_engine(self._engine_url(),
+                                            **pool_options())
+
+    def _engine_url(self):
+        """returns the URL of the database to connect to, through the
+        driver named by HBNB_MYSQL_ASYNC_DRIVER (default: aiomysql)"""
+        return 'mysql+{}://{}:{}@{}/{}'.format(
+            getenv('HBNB_MYSQL_ASYNC_DRIVER', 'aiomysql'),
+            getenv('HBNB_MYSQL_USER'), getenv('HBNB_MYSQL_PWD'),
+            getenv('HBNB_MYSQL_HOST'), getenv('HBNB_MYSQL_DB'))
+
+    async def all(self, cls=None, load=None, **criteria):
+        """query on the session of the current task, keeping the rows
+        whose columns match every column=value pair given in criteria
+
+        Relationships cannot be loaded lazily under asyncio: the ones the
+        caller reads must be listed in load, as for DBStorage.all().
+        """
+        new_dict = {}
+        for clss in classes:
+            if cls is None or cls is classes[clss] or cls is clss:
+                where = _where(classes[clss], criteria)
+                if where is None:
+                    continue
+                query = sqlalchemy.select(classes[clss]).where(*where)
+                query = query.options(*_eager(classes[clss], load))
+                for obj in await self.__session.scalars(query):
+                    key = obj.__class__.__name__ + '.' + obj.id
+                    new_dict[key] = obj
+        return (new_dict)
+
+    async def new(self, obj):
+        """add the object to the session of the current task"""
+        self.__session.add(obj)
+
+    async def save(self):
+        """commit all changes of the session of the current task"""
+        await self.__session.commit()
+
+    async def delete(self, obj=None):
+        """delete from the session of the current task obj if not None"""
+        if obj is not None:
+            await self.__session.delete(obj)
+
+    async def reload(self):
+        """creates the tables and the sessions, one per asyncio task"""
+        async with self.__engine.begin() as connection:
+            await connection.run_sync(_seed)
+        sess_factory = async_sessionmaker(self.__engine,
+                                          expire_on_commit=False,
+                                          sync_session_class=_Session)
+        self.__session = async_scoped_session(sess_factory,
+                                              scopefunc=asyncio.current_task)
+
+    async def close(self):
+        """closes the session of the current task"""
+        await self.__session.remove()
+
+    async def dispose(self):
+        """closes the connections of the pool"""
+        await self.__engine.dispose()
+
+    async def get(self, cls, id):
+        """ retrieves object based on class and ID """
+        if cls and id:
+            cls = classes.get(cls, cls)
+            if cls not in classes.values():
+                return None
+            return await self.__session.get(cls, id)
+        return None
+
+    async def exists(self, cls, id):
+        """tells if a row of cls has the given id, without loading it"""
+        cls = classes.get(cls, cls)
+        if cls not in classes.values() or not id:
+            return False
+        query = sqlalchemy.select(sqlalchemy.exists().where(cls.id == id))
+        return await self.__session.scalar(query)
+
+    async def count(self, cls=None, **criteria):
+        """ counts all objects in storage, or the rows of cls whose columns
+        match every column=value pair given in criteria """
+        if cls is None:
+            return sum([await self.count(clss, **criteria)
+                        for clss in classes])
+        cls = classes.get(cls, cls)
+        if cls not in classes.values():
+            return 0
+        where = _where(cls, criteria)
+        if where is None:
+            return 0
+        query = sqlalchemy.select(sqlalchemy.func.count()).select_from(cls)
+        return await self.__session.scalar(query.where(*where))
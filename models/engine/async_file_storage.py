@@ -0,0 +1,60 @@
+#!/usr/bin/python3
+"""
+Contains the class AsyncFileStorage
+"""
+
+import asyncio
+from models.engine.file_storage import FileStorage
+
+
+class AsyncFileStorage:
+    """FileStorage for asyncio code: every call runs in a worker thread,
+    so neither the file I/O nor the wait for the lock of the storage
+    blocks the event loop"""
+
+    def __init__(self, storage=None):
+        """Instantiate an AsyncFileStorage over storage, a FileStorage"""
+        self.__storage = storage if storage is not None else FileStorage()
+
+    async def all(self, cls=None, load=None, **criteria):
+        """returns what FileStorage.all() returns"""
+        return await asyncio.to_thread(self.__storage.all, cls, load,
+                                       **criteria)
+
+    async def new(self, obj):
+        """sets in the storage the obj with key <obj class name>.id"""
+        await asyncio.to_thread(self.__storage.new, obj)
+
+    async def save(self):
+        """saves the storage and returns the SaveHandle of FileStorage"""
+        return await asyncio.to_thread(self.__storage.save)
+
+    async def flush(self):
+        """writes the saves still waiting to be grouped"""
+        await asyncio.to_thread(self.__storage.flush)
+
+    async def delete(self, obj=None):
+        """deletes obj from the storage if it's inside"""
+        await asyncio.to_thread(self.__storage.delete, obj)
+
+    async def reload(self):
+        """deserializes the JSON file to the storage"""
+        await asyncio.to_thread(self.__storage.reload)
+
+    async def close(self):
+        """picks up the changes made to the JSON file"""
+        await asyncio.to_thread(self.__storage.close)
+
+    async def get(self, cls, id):
+        """ retrieves object based on class and ID """
+        return await asyncio.to_thread(self.__storage.get, cls, id)
+
+    async def exists(self, cls, id):
+        """tells if an object of cls has the given id"""
+        return await asyncio.to_thread(self.__storage.exists, cls, id)
+
+    async def count(self, cls=None, **criteria):
+        """ counts all objects in storage, or those of cls whose attributes
+        match every attribute=value pair given in criteria """
+        return await asyncio.to_thread(self.__storage.count, cls,
+                                       **criteria)
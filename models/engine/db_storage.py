@@ -3,61 +3,274 @@
 Contains the class DBStorage
 """
 
+from contextlib import contextmanager
+from datetime import datetime
 import models
 from models.amenity import Amenity
-from models.base_model import BaseModel, Base
+from models.base_model import BaseModel, Base, parse_dates, time
 from models.city import City
+from models.engine.pool import TimedQueuePool, pool_options
 from models.place import Place
 from models.review import Review
 from models.state import State
 from models.user import User
 from os import getenv
 import sqlalchemy
-from sqlalchemy import create_engine
-from sqlalchemy.orm import scoped_session, sessionmaker
+from sqlalchemy import Column, Integer, String, Table, create_engine, \
+    inspect
+from sqlalchemy.orm import Session, scoped_session, selectinload, \
+    sessionmaker
+from sqlalchemy.orm.util import identity_key
+import uuid
 
 classes = {"Amenity": Amenity, "City": City,
            "Place": Place, "Review": Review, "State": State, "User": User}
 
+if models.storage_t == "db":
+    # one counter per class, bumped by every transaction changing its rows
+    generations = Table("generations", Base.metadata,
+                        Column("name", String(60), primary_key=True),
+                        Column("epoch", String(60), nullable=False),
+                        Column("generation", Integer, nullable=False,
+                               default=0))
+
+
+def _where(cls, criteria):
+    """returns the WHERE clauses of criteria on the table of cls, or
+    None when the table lacks one of their columns"""
+    where = []
+    for attr, value in criteria.items():
+        if attr not in cls.__table__.columns:
+            return None
+        where.append(getattr(cls, attr) == value)
+    return where
+
+
+def _eager(cls, load):
+    """returns the loader options for the relationships of cls named
+    in load, skipping the ones cls does not have"""
+    options = []
+    for path in load or ():
+        option = None
+        clss = cls
+        for name in path.split("."):
+            relationship = inspect(clss).relationships.get(name)
+            if relationship is None:
+                break
+            attr = getattr(clss, name)
+            option = selectinload(attr) if option is None else \
+                option.selectinload(attr)
+            clss = relationship.mapper.class_
+        else:
+            options.append(option)
+    return options
+
+
+def _parents(obj):
+    """returns the (column, id) pairs of the foreign keys of obj, as they
+    were before and are after the changes being flushed, along with
+    ("id", <its own id>)"""
+    state = inspect(obj)
+    parents = {("id", obj.id)}
+    for column in obj.__table__.columns:
+        if column.foreign_keys:
+            history = state.attrs[column.key].history
+            parents.update([(column.key, value)
+                            for value in history.sum() if value is not None])
+    return parents
+
+
+def _seed(connection):
+    """creates the missing tables, and the counters of generations that
+    are missing, each with an epoch of its own so that a class whose
+    table is dropped and created again does not give back its versions"""
+    Base.metadata.create_all(connection)
+    have = set(connection.scalars(sqlalchemy.select(generations.c.name)))
+    rows = [{"name": name, "epoch": uuid.uuid4().hex, "generation": 0}
+            for name in sorted(classes) if name not in have]
+    if rows:
+        connection.execute(sqlalchemy.insert(generations), rows)
+
+
+def _bump(session, names):
+    """adds one to the counters of the classes named in names, in the
+    transaction of session, so that the new versions show with the
+    changes at commit and not before"""
+    if names:
+        session.execute(sqlalchemy.update(generations).where(
+            generations.c.name.in_(sorted(names))).values(
+            generation=generations.c.generation + 1))
+
+
+def _versioned(session, context, instances):
+    """bumps the counters of the classes of the rows session is about to
+    flush"""
+    names = set()
+    for obj in session.new | session.dirty | session.deleted:
+        if obj in session.dirty and not session.is_modified(obj):
+            continue
+        if obj.__class__.__name__ in classes:
+            names.add(obj.__class__.__name__)
+    _bump(session, names)
+
 
 class DBStorage:
     """interaacts with the MySQL database"""
     __engine = None
     __session = None
+    __listeners = None
 
     def __init__(self):
         """Instantiate a DBStorage object"""
+        HBNB_ENV = getenv('HBNB_ENV')
+        self.__listeners = []
+        self.__engine = create_engine(self._engine_url(),
+                                      **self._engine_options())
+        self._configure(self.__engine)
+        if HBNB_ENV == "test":
+            Base.metadata.drop_all(self.__engine)
+
+    def _engine_url(self):
+        """returns the URL of the database to connect to"""
         HBNB_MYSQL_USER = getenv('HBNB_MYSQL_USER')
         HBNB_MYSQL_PWD = getenv('HBNB_MYSQL_PWD')
         HBNB_MYSQL_HOST = getenv('HBNB_MYSQL_HOST')
         HBNB_MYSQL_DB = getenv('HBNB_MYSQL_DB')
-        HBNB_ENV = getenv('HBNB_ENV')
-        self.__engine = create_engine('mysql+mysqldb://{}:{}@{}/{}'.
-                                      format(HBNB_MYSQL_USER,
-                                             HBNB_MYSQL_PWD,
-                                             HBNB_MYSQL_HOST,
-                                             HBNB_MYSQL_DB))
-        if HBNB_ENV == "test":
-            Base.metadata.drop_all(self.__engine)
+        return 'mysql+mysqldb://{}:{}@{}/{}'.format(HBNB_MYSQL_USER,
+                                                    HBNB_MYSQL_PWD,
+                                                    HBNB_MYSQL_HOST,
+                                                    HBNB_MYSQL_DB)
+
+    def _engine_options(self):
+        """returns the keyword arguments given to create_engine, with the
+        settings of the connection pool taken from the environment"""
+        options = pool_options()
+        options["poolclass"] = TimedQueuePool
+        return options
+
+    def _configure(self, engine):
+        """sets up engine right after it is created"""
+        pass
+
+    def all(self, cls=None, load=None, **criteria):
+        """query on the current database session, keeping the rows whose
+        columns match every column=value pair given in criteria
 
-    def all(self, cls=None):
-        """query on the current database session"""
+        load lists relationships, such as "cities" or "cities.places",
+        to load along with the rows in one more query each instead of
+        one per row.
+        """
         new_dict = {}
         for clss in classes:
             if cls is None or cls is classes[clss] or cls is clss:
-                objs = self.__session.query(classes[clss]).all()
-                for obj in objs:
+                where = _where(classes[clss], criteria)
+                if where is None:
+                    continue
+                query = self.__session.query(classes[clss]).filter(*where)
+                query = query.options(*_eager(classes[clss], load))
+                for obj in query.all():
                     key = obj.__class__.__name__ + '.' + obj.id
                     new_dict[key] = obj
         return (new_dict)
 
+    def iter(self, cls=None, batch_size=1000, **criteria):
+        """yields the rows of cls, or of every class, whose columns match
+        criteria, fetching them batch_size at a time
+
+        The rows are read through a session of their own that forgets
+        each batch once it has been handed out, so the memory used does
+        not grow with the size of the tables. It only sees what was
+        committed, and the objects yielded are detached: their columns
+        can be read but their relationships cannot be loaded.
+        """
+        with Session(self.__engine, expire_on_commit=False) as session:
+            for clss in classes:
+                if cls is None or cls is classes[clss] or cls is clss:
+                    where = _where(classes[clss], criteria)
+                    if where is None:
+                        continue
+                    query = sqlalchemy.select(classes[clss]).where(*where)
+                    query = query.execution_options(yield_per=batch_size)
+                    result = session.scalars(query)
+                    for batch in result.partitions():
+                        for obj in batch:
+                            yield obj
+                            session.expunge(obj)
+
     def new(self, obj):
         """add the object to the current database session"""
         self.__session.add(obj)
 
     def save(self):
-        """commit all changes of the current database session"""
-        self.__session.commit()
+        """commit all changes of the current database session, or only
+        flush them inside transaction()"""
+        if self.__session.info.get("transaction"):
+            self.__session.flush()
+        else:
+            self.__session.commit()
+
+    @contextmanager
+    def transaction(self):
+        """groups the changes made in the block into a single commit at its
+        end, or rolls them back if the block raises"""
+        if self.__session.info.get("transaction"):
+            yield self
+            return
+        self.__session.info["transaction"] = True
+        try:
+            yield self
+            self.__session.info.pop("transaction", None)
+            self.__session.commit()
+        except BaseException:
+            self.__session.rollback()
+            raise
+        finally:
+            self.__session.info.pop("transaction", None)
+
+    def bulk_new(self, objs):
+        """adds every object of objs and commits them in one transaction,
+        the inserts of each table being sent in batches"""
+        self.__session.add_all(objs)
+        self.save()
+
+    def bulk_update(self, cls, changes):
+        """sets the columns of every dictionary of changes on the row of
+        cls with the id it holds under "id", with one executemany per set
+        of columns, and commits them in one transaction
+
+        updated_at is set to now unless a dictionary gives it, ids
+        matching no row and keys matching no column are skipped. Dates
+        may be given as to_dict() writes them; ValueError is raised,
+        before any row is changed, when one is not a date.
+        """
+        cls = classes.get(cls, cls)
+        table = cls.__table__
+        now = datetime.utcnow()
+        changes = [parse_dates(change) for change in changes]
+        groups = {}
+        for change in changes:
+            row = {attr: value for attr, value in change.items()
+                   if attr in table.columns and
+                   attr not in ("id", "created_at")}
+            row.setdefault("updated_at", now)
+            row["_id"] = change["id"]
+            groups.setdefault(tuple(sorted(row)), []).append(row)
+        for attrs, rows in groups.items():
+            query = sqlalchemy.update(table).where(
+                table.c.id == sqlalchemy.bindparam("_id")).values(
+                {attr: sqlalchemy.bindparam(attr)
+                 for attr in attrs if attr != "_id"})
+            self.__session.execute(query, rows)
+        _bump(self.__session, [cls.__name__])
+        self.__session.info.setdefault("changes", []).append(
+            (cls.__name__, None))
+        for rows in groups.values():
+            for row in rows:
+                obj = self.__session.identity_map.get(
+                    identity_key(cls, row["_id"]))
+                if obj is not None:
+                    self.__session.expire(obj)
+        self.save()
 
     def delete(self, obj=None):
         """delete from the current database session obj if not None"""
@@ -66,11 +279,94 @@ class DBStorage:
 
     def reload(self):
         """reloads data from the database"""
-        Base.metadata.create_all(self.__engine)
+        with self.__engine.begin() as connection:
+            _seed(connection)
         sess_factory = sessionmaker(bind=self.__engine, expire_on_commit=False)
+        sqlalchemy.event.listen(sess_factory, "before_flush", _versioned)
+        sqlalchemy.event.listen(sess_factory, "after_flush", self._flushed)
+        sqlalchemy.event.listen(sess_factory, "after_commit", self._committed)
+        sqlalchemy.event.listen(sess_factory, "after_rollback",
+                                self._rolled_back)
         Session = scoped_session(sess_factory)
         self.__session = Session
 
+    def subscribe(self, listener):
+        """calls listener(<class name>, parents) after every commit of
+        this process changing rows of a class, parents being the set of
+        the (column, id) pairs, such as ("state_id", <id>) or ("id",
+        <id>), that the rows changed had before or have after the change,
+        or None when any row of the class may have changed
+
+        The changes committed by other processes are not seen.
+        """
+        self.__listeners.append(listener)
+
+    def unsubscribe(self, listener):
+        """stops calling listener"""
+        if listener in self.__listeners:
+            self.__listeners.remove(listener)
+
+    def _flushed(self, session, context):
+        """notes the rows the flush of session changed"""
+        changes = session.info.setdefault("changes", [])
+        for obj in session.new | session.dirty | session.deleted:
+            if obj.__class__.__name__ in classes:
+                changes.append((obj.__class__.__name__, _parents(obj)))
+
+    def _committed(self, session):
+        """tells the listeners of the rows the commit of session changed"""
+        for name, parents in session.info.pop("changes", []):
+            for listener in self.__listeners:
+                listener(name, parents)
+
+    def _rolled_back(self, session):
+        """forgets the rows the flushes of session changed"""
+        session.info.pop("changes", None)
+
+    def migrate(self):
+        """creates the tables and indexes of the models missing from the
+        database, leaving the data alone, and returns the names of the
+        indexes created on existing tables
+
+        On MySQL, the dates of tables made before they kept microseconds
+        are widened to DATETIME(6), and returned as <table>.<column>.
+        """
+        with self.__engine.begin() as connection:
+            _seed(connection)
+        inspector = inspect(self.__engine)
+        created = []
+        for table in Base.metadata.sorted_tables:
+            if self.__engine.dialect.name == "mysql":
+                created.extend(self._widen(inspector, table))
+            existing = [tuple(index["column_names"])
+                        for index in inspector.get_indexes(table.name)]
+            existing.append(tuple(inspector.get_pk_constraint(
+                table.name)["constrained_columns"]))
+            for index in sorted(table.indexes, key=lambda i: i.name):
+                columns = tuple(column.name for column in index.columns)
+                if any([have[:len(columns)] == columns
+                        for have in existing]):
+                    continue
+                index.create(self.__engine)
+                created.append(index.name)
+        return created
+
+    def _widen(self, inspector, table):
+        """alters the date columns of table that have no fractional
+        seconds in the database to DATETIME(6), returning their names"""
+        widened = []
+        for column in inspector.get_columns(table.name):
+            if column["name"] not in ("created_at", "updated_at") or \
+                    getattr(column["type"], "fsp", None) == 6:
+                continue
+            with self.__engine.begin() as connection:
+                connection.exec_driver_sql(
+                    "ALTER TABLE `{}` MODIFY `{}` DATETIME(6){}".format(
+                        table.name, column["name"],
+                        "" if column["nullable"] else " NOT NULL"))
+            widened.append("{}.{}".format(table.name, column["name"]))
+        return widened
+
     def close(self):
         """call remove() method on the private session attribute"""
         self.__session.remove()
@@ -78,12 +374,116 @@ class DBStorage:
     def get(self, cls, id):
         """ retrieves object based on class and ID """
         if cls and id:
-            fetch = "{}.{}".format(cls, id)
-            all_objects = self.all(cls)
-            return all_objects.get(fetch)
+            cls = classes.get(cls, cls)
+            if cls not in classes.values():
+                return None
+            return self.__session.get(cls, id)
         else:
             return None
 
-    def count(self, cls=None):
-        """ counts all objects in storage """
-        return (len(self.all(cls)))
+    def exists(self, cls, id):
+        """tells if a row of cls has the given id, without loading it"""
+        cls = classes.get(cls, cls)
+        if cls not in classes.values() or not id:
+            return False
+        query = sqlalchemy.select(sqlalchemy.exists().where(cls.id == id))
+        return self.__session.execute(query).scalar()
+
+    def count(self, cls=None, **criteria):
+        """ counts all objects in storage, or the rows of cls whose columns
+        match every column=value pair given in criteria """
+        if cls is None:
+            if criteria:
+                return sum([self.count(clss, **criteria)
+                            for clss in classes])
+            return sum(self.counts().values())
+        cls = classes.get(cls, cls)
+        if cls not in classes.values():
+            return 0
+        where = _where(cls, criteria)
+        if where is None:
+            return 0
+        query = sqlalchemy.select(sqlalchemy.func.count()).select_from(cls)
+        return self.__session.execute(query.where(*where)).scalar()
+
+    def page(self, cls, limit, after=None, **criteria):
+        """returns up to limit rows of cls whose columns match criteria,
+        in the order of (created_at, id) and coming after the position
+        after, along with the position of the last one, or None when no
+        row comes after it
+
+        A position is a (created_at, id) tuple, created_at being written
+        as in to_dict(), and the page is read from the index on
+        created_at with WHERE (created_at, id) > after. Raises ValueError
+        when limit is less than 1.
+        """
+        if limit < 1:
+            raise ValueError("limit must be at least 1")
+        cls = classes.get(cls, cls)
+        where = _where(cls, criteria) if cls in classes.values() else None
+        if where is None:
+            return [], None
+        query = sqlalchemy.select(cls, cls.created_at, cls.id).where(*where)
+        if after:
+            query = query.where(
+                sqlalchemy.tuple_(cls.created_at, cls.id) >
+                sqlalchemy.tuple_(datetime.strptime(after[0], time),
+                                  after[1]))
+        query = query.order_by(cls.created_at, cls.id).limit(limit + 1)
+        rows = self.__session.execute(query).all()
+        if len(rows) <= limit:
+            return [row[0] for row in rows], None
+        last = rows[limit - 1]
+        return ([row[0] for row in rows[:limit]],
+                (last[1].strftime(time), last[2]))
+
+    def places_search(self, states=(), cities=(), amenities=()):
+        """returns the places in the cities of states or in cities, or
+        all of them when both are empty, that have every amenity of
+        amenities, in a single query"""
+        query = sqlalchemy.select(Place)
+        if states or cities:
+            query = query.where(sqlalchemy.or_(
+                Place.city_id.in_(set(cities)),
+                Place.city_id.in_(sqlalchemy.select(City.id).where(
+                    City.state_id.in_(set(states))))))
+        if amenities:
+            place_amenity = Place.__table__.metadata.tables["place_amenity"]
+            query = query.where(Place.id.in_(
+                sqlalchemy.select(place_amenity.c.place_id)
+                .where(place_amenity.c.amenity_id.in_(set(amenities)))
+                .group_by(place_amenity.c.place_id)
+                .having(sqlalchemy.func.count() == len(set(amenities)))))
+        return list(self.__session.scalars(query))
+
+    def generation(self, cls):
+        """returns a string that changes whenever a row of cls is added,
+        updated or deleted, and None as the date of the change is unknown
+
+        The string holds the counter of cls in generations, which every
+        transaction changing its rows bumps before it commits.
+        """
+        name = cls if isinstance(cls, str) else cls.__name__
+        query = sqlalchemy.select(generations.c.epoch,
+                                  generations.c.generation)
+        row = self.__session.execute(
+            query.where(generations.c.name == name)).one_or_none()
+        return ("{}.{}".format(*row) if row else "", None)
+
+    def pool_stats(self):
+        """returns a dictionary of the live state of the connection pool:
+        its size, the connections checked in and out, the overflow, and
+        how long checkouts waited for a connection so far"""
+        pool = self.__engine.pool
+        if isinstance(pool, TimedQueuePool):
+            return pool.stats()
+        return {"status": pool.status()}
+
+    def counts(self):
+        """returns the number of objects of every class, by class name,
+        counted by the database in a single query"""
+        query = sqlalchemy.union_all(*[
+            sqlalchemy.select(sqlalchemy.literal(name),
+                              sqlalchemy.func.count()).select_from(cls)
+            for name, cls in classes.items()])
+        return {name: count for name, count in self.__session.execute(query)}
@@ -3,17 +3,74 @@
 Contains the FileStorage class
 """
 
+import atexit
+import bisect
+from contextlib import contextmanager
+from datetime import datetime
+import fcntl
 import json
 from models.amenity import Amenity
-from models.base_model import BaseModel
+from models.base_model import BaseModel, parse_dates, time
 from models.city import City
+from models.engine import journal
+from models.engine.flusher import Flusher, SaveHandle
+from models.engine.rwlock import ReadWriteLock
 from models.place import Place
 from models.review import Review
 from models.state import State
 from models.user import User
+from os import getenv
+import os
+import threading
+import uuid
 
 classes = {"Amenity": Amenity, "BaseModel": BaseModel, "City": City,
            "Place": Place, "Review": Review, "State": State, "User": User}
+# attributes holding the id of a parent object, indexed by class name
+references = {"City": ("state_id",), "Place": ("city_id", "user_id"),
+              "Review": ("place_id", "user_id")}
+# attributes holding a list of ids of related objects, indexed by
+# class name like references, each key being filed under every id
+id_lists = {"Place": ("amenity_ids",)}
+# dictionary - (<class name>, <attribute>) of the children each
+# relationship property lists, by (<class name>, <property>)
+relationships = {("State", "cities"): ("City", "state_id"),
+                 ("City", "places"): ("Place", "city_id"),
+                 ("User", "places"): ("Place", "user_id"),
+                 ("User", "reviews"): ("Review", "user_id"),
+                 ("Place", "reviews"): ("Review", "place_id")}
+
+
+def _name_of(cls):
+    """returns the class name of cls, which may be a class or a string"""
+    if isinstance(cls, str):
+        return cls
+    return cls.__name__
+
+
+def _ref_values(name, attr, value):
+    """returns the ids the value of attr of class name is filed under"""
+    if attr in id_lists.get(name, ()):
+        return value
+    return (value,)
+
+
+def _created(values):
+    """returns created_at of the attributes of an object or of the
+    dictionary read by reload() as to_dict() writes it, which sorts in
+    the order of the dates"""
+    created_at = values.get("created_at", "")
+    if isinstance(created_at, datetime):
+        return created_at.strftime(time)
+    return created_at
+
+
+def _matches(obj, criteria):
+    """tells if every attribute=value pair of criteria holds for obj"""
+    for attr, value in criteria.items():
+        if getattr(obj, attr, None) != value:
+            return False
+    return True
 
 
 class FileStorage:
@@ -23,47 +80,741 @@ class FileStorage:
     __file_path = "file.json"
     # dictionary - empty but will store all objects by <class name>.id
     __objects = {}
+    # dictionary - the same objects grouped by <class name>
+    __by_class = {}
+    # dictionary - keys of the objects pointing to a parent, by
+    # (<class name>, <attribute>) and then by parent id
+    __refs = {}
+    # dictionary - the parent ids, or tuples of ids for id_lists, each
+    # key is filed under in __refs
+    __ref_ids = {}
+    # dictionary - sorted list of the (created_at, id) of the objects of
+    # every class, by <class name>
+    __order = {}
+    # dictionary - the (created_at, id) each key is filed under in __order
+    __positions = {}
+    # dictionary - number of times the objects of every class changed, by
+    # <class name>
+    __generations = {}
+    # dictionary - when the objects of every class last changed, by
+    # <class name>
+    __modified = {}
+    # list - callables told of every change, see subscribe()
+    __listeners = []
+    # string - tells the generations of this process from those handed
+    # out by other processes or before a restart
+    __epoch = uuid.uuid4().hex[:12]
+    # datetime - when this process started counting generations
+    __started = datetime.utcnow()
+    # set - keys of the objects added, updated or deleted since save()
+    __dirty = set()
+    # dictionary - (object, '"<key>": <JSON of the object>') by key, as
+    # of the last time the object was serialized
+    __fragments = {}
+    # boolean - append changes to <__file_path>.log instead of rewriting
+    # the JSON file, which is only rewritten when the log gets too long
+    __journal = getenv("HBNB_FILE_JOURNAL") == "1"
+    # integer - size in bytes of the log that triggers a rewrite
+    __journal_limit = int(getenv("HBNB_FILE_JOURNAL_LIMIT", 4 * 1024 ** 2))
+    # thread - rewriting the JSON file in the background, if any
+    __compaction = None
+    # boolean - keep the dictionaries read by reload() and only build
+    # the objects the first time they are asked for
+    __lazy = getenv("HBNB_FILE_LAZY") == "1"
+    # dictionary - dictionaries read by reload() and not yet turned into
+    # objects, by <class name> and then by key
+    __raw = {}
+    # dictionary - updated_at of every object as it is on disk, by key
+    __versions = {}
+    # tuple - inode, size and mtime of the files as last read or written
+    __stamp = None
+    # integer - offset in the log up to which it was read or written
+    __log_offset = 0
+    # lock - taken to read by all(), get() and count() and to write by
+    # the methods changing __objects, its indexes or the files
+    __lock = ReadWriteLock()
+    # lock - taken by readers building objects from __raw
+    __build_lock = threading.RLock()
+    # boolean - share the files with other processes, which take turns
+    # through <__file_path>.lock
+    __shared = getenv("HBNB_FILE_SHARED") == "1"
+    # float - seconds save() lets its changes wait so that they are
+    # written together with the following ones, 0 to write them at once
+    __flush_interval = float(getenv("HBNB_FILE_FLUSH_INTERVAL", 0))
+    # integer - number of waiting saves that get written without waiting
+    # for the end of the interval
+    __flush_batch = int(getenv("HBNB_FILE_FLUSH_BATCH", 100))
+    # Flusher - writing the waiting saves in the background, if any
+    __flusher = None
+    # integer - ident of the thread inside transaction(), if any
+    __transaction = None
+    # list - handles of the saves put off until the transaction ends
+    __deferred = []
+
+    def all(self, cls=None, load=None, **criteria):
+        """returns the dictionary __objects, or a new dictionary with the
+        objects of cls whose attributes match every attribute=value pair
+        given in criteria
+
+        Without cls nor criteria, the dictionary returned is __objects
+        itself, which other threads may change while it is iterated over.
+        load lists relationships, such as "cities" or "cities.places",
+        whose objects get built along with the ones returned.
+        """
+        with self.__lock.read():
+            if cls is None and criteria:
+                objs = {}
+                for name in classes:
+                    objs.update(self.all(name, load, **criteria))
+                return objs
+            if cls is None:
+                for name in list(self.__raw):
+                    self._hydrate_class(name)
+                return self.__objects
+            objs = self._select(_name_of(cls), criteria)
+            for path in load or ():
+                self._prefetch(_name_of(cls), objs.values(), path)
+            return objs
+
+    def _select(self, name, criteria):
+        """returns a new dictionary with the objects of class name whose
+        attributes match criteria"""
+        with self.__lock.read():
+            keys = self._indexed_keys(name, criteria)
+            if keys is None:
+                self._hydrate_class(name)
+                objs = dict(self.__by_class.get(name, {}))
+            else:
+                objs = {}
+                for key in keys:
+                    obj = self._lookup(name, key)
+                    if obj is not None:
+                        objs[key] = obj
+            if not criteria:
+                return objs
+            return {key: obj for key, obj in objs.items()
+                    if _matches(obj, criteria)}
+
+    def iter(self, cls=None, batch_size=1000, **criteria):
+        """yields the objects of cls, or of every class, whose attributes
+        match criteria, looking them up batch_size at a time
+
+        The lock is only held while a batch is looked up, so the caller
+        may change the storage between two objects. Objects added while
+        iterating may not be yielded.
+        """
+        names = list(classes) if cls is None else [_name_of(cls)]
+        for name in names:
+            with self.__lock.read(), self.__build_lock:
+                keys = self._indexed_keys(name, criteria)
+                if keys is None:
+                    keys = (list(self.__by_class.get(name, ())) +
+                            list(self.__raw.get(name, ())))
+            for i in range(0, len(keys), batch_size):
+                with self.__lock.read():
+                    objs = [self._lookup(name, key)
+                            for key in keys[i:i + batch_size]]
+                for obj in objs:
+                    if obj is not None and _matches(obj, criteria):
+                        yield obj
+
+    def _prefetch(self, name, objs, path):
+        """builds in one pass the objects the relationship path leads to
+        from objs of class name, ignoring unknown relationships"""
+        rel, _, rest = path.partition(".")
+        if (name, rel) not in relationships:
+            return
+        child, attr = relationships[(name, rel)]
+        children = []
+        for obj in objs:
+            for key in self._indexed_keys(child, {attr: obj.id}):
+                found = self._lookup(child, key)
+                if found is not None:
+                    children.append(found)
+        if rest:
+            self._prefetch(child, children, rest)
+
+    def _indexed_keys(self, name, criteria):
+        """returns the keys filed in __refs under the first parent id given
+        in criteria, or None when criteria holds no parent id"""
+        for attr in references.get(name, ()):
+            if attr in criteria:
+                parents = self.__refs.get((name, attr), {})
+                return list(parents.get(criteria[attr], ()))
+        return None
+
+    def _lookup(self, name, key):
+        """returns the object of class name stored under key, if any"""
+        obj = self.__by_class.get(name, {}).get(key)
+        if obj is None and key in self.__raw.get(name, {}):
+            obj = self._hydrate(name, key)
+        return obj
 
-    def all(self, cls=None):
-        """returns the dictionary __objects"""
-        if cls is not None:
-            new_dict = {}
-            for key, value in self.__objects.items():
-                if cls == value.__class__ or cls == value.__class__.__name__:
-                    new_dict[key] = value
-            return new_dict
-        return self.__objects
+    def _hydrate(self, name, key):
+        """turns the dictionary read by reload() under key into an object,
+        unless another thread just did"""
+        with self.__build_lock:
+            raws = self.__raw.get(name, {})
+            if key not in raws:
+                return self.__by_class.get(name, {}).get(key)
+            raw = raws[key]
+            obj = classes[name](**raw)
+            cached = self.__fragments.get(key)
+            if cached is not None and cached[0] is raw:
+                self.__fragments[key] = (obj, cached[1])
+            self._add(key, obj)
+            del raws[key]
+            if not raws:
+                del self.__raw[name]
+            return obj
+
+    def _hydrate_class(self, name):
+        """turns every dictionary of class name read by reload() into an
+        object"""
+        if name in self.__raw:
+            with self.__build_lock:
+                for key in list(self.__raw.get(name, ())):
+                    self._hydrate(name, key)
 
     def new(self, obj):
         """sets in __objects the obj with key <obj class name>.id"""
         if obj is not None:
             key = obj.__class__.__name__ + "." + obj.id
-            self.__objects[key] = obj
+            with self.__lock.write():
+                if self.__objects.get(key) is obj and key in self.__dirty:
+                    # touch() already told of the attributes set on it
+                    return
+                parents = self._parents(key)
+                if key in self.__raw.get(obj.__class__.__name__, {}):
+                    self._remove(key)
+                self._add(key, obj)
+                self.__dirty.add(key)
+                self._changed(obj.__class__.__name__,
+                              parents | self._parents(key))
+
+    def touch(self, obj):
+        """marks obj as changed and files it again in the indexes, when it
+        is the object stored under its key, so that an attribute set on
+        it is written by the next save()"""
+        key = "{}.{}".format(obj.__class__.__name__, obj.__dict__.get("id"))
+        if self.__objects.get(key) is not obj:
+            return
+        with self.__lock.write():
+            if self.__objects.get(key) is not obj:
+                return
+            name = obj.__class__.__name__
+            parents = self._parents(key)
+            self._index_refs(key, name, obj.__dict__)
+            self._index_order(key, name, obj.__dict__)
+            self.__dirty.add(key)
+            self._changed(name, parents | self._parents(key))
+
+    def _parents(self, key):
+        """returns the (attribute, id) pairs key is filed under in __refs,
+        along with ("id", <its own id>)"""
+        name, _, id = key.partition(".")
+        parents = {("id", id)}
+        for attr, value in self.__ref_ids.get(key, {}).items():
+            parents.update([(attr, parent_id)
+                            for parent_id in _ref_values(name, attr, value)])
+        return parents
+
+    def _changed(self, name, parents=None):
+        """counts a change to the objects of class name and tells the
+        listeners, parents holding the (attribute, id) pairs of the
+        objects changed before and after the change, or None when they
+        are not known"""
+        self.__generations[name] = self.__generations.get(name, 0) + 1
+        self.__modified[name] = datetime.utcnow()
+        for listener in self.__listeners:
+            listener(name, parents)
+
+    def subscribe(self, listener):
+        """calls listener(<class name>, parents) after every change to
+        the objects of a class, parents being the set of the (attribute,
+        id) pairs, such as ("state_id", <id>) or ("id", <id>), that the
+        objects changed had before or have after the change, or None when
+        any object of the class may have changed
+
+        Listeners are called with the lock of the storage held: they must
+        be quick and must not use the storage.
+        """
+        with self.__lock.write():
+            self.__listeners.append(listener)
+
+    def unsubscribe(self, listener):
+        """stops calling listener"""
+        with self.__lock.write():
+            if listener in self.__listeners:
+                self.__listeners.remove(listener)
+
+    def generation(self, cls):
+        """returns a string that changes whenever an object of cls is
+        added, updated or deleted, and when they last changed, so that
+        clients can tell if what they read is still current
+
+        The string holds a counter of this process, and a token that
+        keeps it from matching the ones of other processes.
+        """
+        name = _name_of(cls)
+        with self.__lock.read():
+            return ("{}.{}".format(self.__epoch,
+                                   self.__generations.get(name, 0)),
+                    self.__modified.get(name, self.__started))
+
+    def _add(self, key, obj):
+        """stores obj under key in __objects and its indexes"""
+        self.__objects[key] = obj
+        self.__by_class.setdefault(obj.__class__.__name__, {})[key] = obj
+        self._index_refs(key, obj.__class__.__name__, obj.__dict__)
+        self._index_order(key, obj.__class__.__name__, obj.__dict__)
+
+    def _add_raw(self, key, raw):
+        """stores the dictionary raw of an object under key, unbuilt"""
+        self._remove(key)
+        self.__raw.setdefault(raw["__class__"], {})[key] = raw
+        self._index_refs(key, raw["__class__"], raw)
+        self._index_order(key, raw["__class__"], raw)
+
+    def _remove(self, key):
+        """drops key from __objects and its indexes, tells if it was there"""
+        name = key.partition(".")[0]
+        obj = self.__objects.pop(key, None)
+        if obj is not None:
+            self.__by_class.get(name, {}).pop(key, None)
+        elif self.__raw.get(name, {}).pop(key, None) is None:
+            return False
+        self._unindex_refs(key, name)
+        self._unindex_order(key, name)
+        return True
+
+    def _index_refs(self, key, name, values):
+        """files key under the parent ids found in values, the attributes
+        of the object or the dictionary read by reload()"""
+        ids = {attr: values.get(attr, getattr(classes.get(name), attr, None))
+               for attr in references.get(name, ())}
+        for attr in id_lists.get(name, ()):
+            ids[attr] = tuple(values.get(
+                attr, getattr(classes.get(name), attr, None)) or ())
+        if ids == self.__ref_ids.get(key):
+            return
+        self._unindex_refs(key, name)
+        for attr, value in ids.items():
+            parents = self.__refs.setdefault((name, attr), {})
+            for parent_id in _ref_values(name, attr, value):
+                parents.setdefault(parent_id, set()).add(key)
+        self.__ref_ids[key] = ids
+
+    def _unindex_refs(self, key, name):
+        """removes key from the parent ids it was filed under"""
+        for attr, value in self.__ref_ids.pop(key, {}).items():
+            for parent_id in _ref_values(name, attr, value):
+                children = self.__refs[(name, attr)].get(parent_id)
+                if children is None:
+                    continue
+                children.discard(key)
+                if not children:
+                    del self.__refs[(name, attr)][parent_id]
+
+    def _index_order(self, key, name, values):
+        """files key in __order under the created_at found in values, the
+        attributes of the object or the dictionary read by reload()"""
+        position = (_created(values), key.partition(".")[2])
+        if position == self.__positions.get(key):
+            return
+        self._unindex_order(key, name)
+        bisect.insort(self.__order.setdefault(name, []), position)
+        self.__positions[key] = position
+
+    def _unindex_order(self, key, name):
+        """removes key from __order"""
+        position = self.__positions.pop(key, None)
+        if position is None:
+            return
+        order = self.__order[name]
+        i = bisect.bisect_left(order, position)
+        if i < len(order) and order[i] == position:
+            del order[i]
 
     def save(self):
-        """serializes __objects to the JSON file (path: __file_path)"""
-        json_objects = {}
-        for key in self.__objects:
-            json_objects[key] = self.__objects[key].to_dict()
-        with open(self.__file_path, 'w') as f:
-            json.dump(json_objects, f)
+        """serializes __objects to the JSON file (path: __file_path), the
+        objects given to new() or changed by setting their attributes
+        since they were last written being serialized again
+
+        Returns a SaveHandle telling when the changes are on disk, which
+        is right away unless __flush_interval is set, in which case they
+        are written in the background along with the saves that follow.
+        Inside transaction(), the changes are only written when it ends.
+        """
+        if self.__transaction == threading.get_ident():
+            handle = SaveHandle()
+            self.__deferred.append(handle)
+            return handle
+        if self.__flush_interval <= 0:
+            self._write()
+            return SaveHandle(done=True)
+        with self.__lock.write():
+            if self.__flusher is None:
+                FileStorage.__flusher = Flusher(self._write,
+                                                self.__flush_interval,
+                                                self.__flush_batch)
+                atexit.register(self.__flusher.flush)
+        return self.__flusher.submit()
+
+    def flush(self):
+        """writes the changes of the saves still waiting, if any, and
+        returns once they are on disk"""
+        if self.__flusher is not None:
+            self.__flusher.flush()
+
+    @contextmanager
+    def transaction(self):
+        """groups the changes made in the block into a single write at its
+        end, or undoes them if the block raises
+
+        The block holds the lock of the storage, so other threads wait
+        for it to end. Only the changes that went through new(), save(),
+        delete() or the setting of an attribute can be undone.
+        """
+        me = threading.get_ident()
+        with self.__lock.write():
+            if self.__transaction == me:
+                yield self
+                return
+            FileStorage.__transaction = me
+            start = {key: (self.__objects[key].to_dict()
+                           if key in self.__objects else None)
+                     for key in self.__dirty}
+            error = None
+            try:
+                yield self
+            except BaseException as e:
+                error = e
+                self._rollback(start)
+                raise
+            else:
+                FileStorage.__transaction = None
+                try:
+                    self._write()
+                except Exception as e:
+                    error = e
+                    raise
+            finally:
+                FileStorage.__transaction = None
+                handles, FileStorage.__deferred = self.__deferred, []
+                for handle in handles:
+                    handle.finish(error)
+
+    def _rollback(self, start):
+        """undoes the changes made since the beginning of a transaction,
+        start holding the dictionaries of the objects that were already
+        changed then, and the disk holding the others"""
+        touched = self.__dirty - set(start)
+        for key in touched:
+            self._changed(key.partition(".")[0], self._parents(key))
+            self._remove(key)
+            self.__dirty.discard(key)
+            self.__versions.pop(key, None)
+            self.__fragments.pop(key, None)
+        if touched:
+            with self._flock(fcntl.LOCK_SH):
+                jo = self._read_disk()[0]
+            self._apply({key: jo.get(key) for key in touched})
+        for key, data in start.items():
+            obj = self.__objects.get(key)
+            if (obj.to_dict() if obj is not None else None) == data:
+                continue
+            parents = self._parents(key)
+            self._remove(key)
+            if data is not None:
+                self._add(key, classes[data["__class__"]](**data))
+            self.__dirty.add(key)
+            self._changed(key.partition(".")[0],
+                          parents | self._parents(key))
+
+    def _write(self):
+        """writes the changes to the JSON file or to its log"""
+        with self.__lock.write(), self._flock(fcntl.LOCK_EX):
+            self._catch_up()
+            if self.__journal:
+                self._append_changes()
+                return
+            journal.write_atomic(self.__file_path, self._serialize())
+            self.__dirty.clear()
+            FileStorage.__stamp = self._stamp()
+
+    @contextmanager
+    def _flock(self, operation):
+        """holds the lock file of the JSON file in shared mode, exclusively
+        or not depending on operation"""
+        if not self.__shared:
+            yield
+            return
+        with open(self.__file_path + ".lock", "a") as f:
+            fcntl.flock(f, operation)
+            yield
+
+    def _catch_up(self):
+        """picks up what other processes wrote before writing in turn"""
+        if self.__shared:
+            stamp = self._stamp()
+            if stamp != self.__stamp:
+                self._apply(self._read_changes(stamp, exclusive=True))
+                FileStorage.__stamp = stamp
+
+    def _fragment(self, key, obj):
+        """returns the '"<key>": <JSON>' text of obj, or of the dictionary
+        read by reload(), from the cache unless obj changed since it was
+        last serialized"""
+        cached = self.__fragments.get(key)
+        if cached is None or cached[0] is not obj or key in self.__dirty:
+            data = obj if isinstance(obj, dict) else obj.to_dict()
+            cached = (obj, json.dumps({key: data})[1:-1])
+            self.__fragments[key] = cached
+            self.__versions[key] = data.get("updated_at")
+        return cached[1]
+
+    def _serialize(self):
+        """returns the JSON text of __objects, only calling to_dict() on
+        the objects that changed since they were last serialized"""
+        for key in self.__dirty:
+            if key not in self.__objects:
+                self.__fragments.pop(key, None)
+                self.__versions.pop(key, None)
+        parts = [self._fragment(key, obj)
+                 for key, obj in self.__objects.items()]
+        for raws in self.__raw.values():
+            parts.extend([self._fragment(key, raw)
+                          for key, raw in raws.items()])
+        if len(self.__fragments) > len(parts):
+            for key in list(self.__fragments):
+                name = key.partition(".")[0]
+                if (key not in self.__objects and
+                        key not in self.__raw.get(name, {})):
+                    del self.__fragments[key]
+        return "{" + ", ".join(parts) + "}"
+
+    def _append_changes(self):
+        """appends the objects changed since the last save to the log"""
+        parts = []
+        for key in self.__dirty:
+            obj = self.__objects.get(key)
+            if obj is not None:
+                parts.append(self._fragment(key, obj))
+            else:
+                self.__fragments.pop(key, None)
+                self.__versions.pop(key, None)
+                parts.append(json.dumps({key: None})[1:-1])
+        self.__dirty.clear()
+        if parts:
+            size = journal.append(self.__file_path + ".log",
+                                  "{" + ", ".join(parts) + "}")
+            FileStorage.__log_offset = size
+            FileStorage.__stamp = self._stamp()
+            if size > self.__journal_limit:
+                self._compact()
+
+    def _compact(self):
+        """rotates the log and rewrites the JSON file in the background"""
+        if self.__compaction is not None and self.__compaction.is_alive():
+            return
+        guard = None
+        if self.__shared:
+            # held until the JSON file is written, so that processes only
+            # compact one at a time
+            guard = open(self.__file_path + ".compact", "a")
+            try:
+                fcntl.flock(guard, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                guard.close()
+                return
+        # no other compaction is running, so the snapshots still around
+        # were left by processes that exited in the middle of one
+        journal.remove_temps(self.__file_path)
+        old = self.__file_path + ".log.old"
+        journal.rotate(self.__file_path + ".log", old)
+        text = self._serialize()
+        FileStorage.__log_offset = 0
+        FileStorage.__stamp = self._stamp()
+        if self.__compaction is None:
+            atexit.register(self._join_compaction)
+        FileStorage.__compaction = threading.Thread(
+            target=self._write_compaction, args=(text, old, guard),
+            daemon=True)
+        self.__compaction.start()
+
+    def _join_compaction(self):
+        """waits for the compaction running in the background, if any, so
+        that exiting does not leave its snapshot behind"""
+        if self.__compaction is not None:
+            self.__compaction.join()
+
+    def _write_compaction(self, text, old, guard):
+        """writes the JSON file of a compaction, run in the background"""
+        try:
+            tmp = journal.write_temp(self.__file_path, text)
+            with self.__lock.write(), self._flock(fcntl.LOCK_EX):
+                self._catch_up()
+                journal.compact(self.__file_path, tmp, old)
+                FileStorage.__stamp = self._stamp()
+        finally:
+            if guard is not None:
+                guard.close()
+
+    def _stamp(self):
+        """returns the inode, size and mtime of the JSON file and logs"""
+        paths = [self.__file_path]
+        if self.__journal:
+            paths += [self.__file_path + ".log.old", self.__file_path + ".log"]
+        stamp = []
+        for path in paths:
+            try:
+                st = os.stat(path)
+                stamp.append((st.st_ino, st.st_size, st.st_mtime_ns))
+            except OSError:
+                stamp.append(None)
+        return tuple(stamp)
 
     def reload(self):
-        """deserializes the JSON file to __objects"""
+        """deserializes the JSON file to __objects, only picking up the
+        objects that changed on disk since it was last read or written"""
+        with self.__lock.write():
+            stamp = self._stamp()
+            if stamp == self.__stamp:
+                return
+            with self._flock(fcntl.LOCK_SH):
+                stamp = self._stamp()
+                self._apply(self._read_changes(stamp))
+            FileStorage.__stamp = stamp
+
+    def _read_changes(self, stamp, exclusive=False):
+        """returns the dictionaries of the objects that may have changed on
+        disk since the files were last read or written, as of stamp
+
+        The end of the log is only cut when the last write to it did not
+        finish, which in shared mode is only known when exclusive.
+        """
+        log = self.__file_path + ".log"
+        last = self.__stamp
+        jo = {}
+        if (self.__journal and last is not None and stamp[:2] == last[:2] and
+                stamp[2] is not None and stamp[2][1] >= self.__log_offset and
+                (last[2] is None or stamp[2][0] == last[2][0])):
+            # only the log grew: replay what was appended since
+            FileStorage.__log_offset = journal.replay(log, jo,
+                                                      self.__log_offset)
+            return jo
+        jo, FileStorage.__log_offset = self._read_disk()
+        if self.__journal and (exclusive or not self.__shared):
+            journal.truncate(log, self.__log_offset)
+        for key in list(self.__versions):
+            if key not in jo:
+                jo[key] = None
+        return jo
+
+    def _read_disk(self):
+        """returns the dictionaries of every object on disk, and the offset
+        in the log right after its last complete line"""
+        log = self.__file_path + ".log"
         try:
             with open(self.__file_path, 'r') as f:
                 jo = json.load(f)
-            for key in jo:
-                self.__objects[key] = classes[jo[key]["__class__"]](**jo[key])
-        except:
-            pass
+        except (OSError, ValueError):
+            jo = {}
+        if not self.__journal:
+            return jo, self.__log_offset
+        journal.replay(log + ".old", jo)
+        return jo, journal.replay(log, jo)
+
+    def _apply(self, jo):
+        """brings __objects in line with the dictionaries read from disk,
+        where None stands for a deleted object, leaving alone the objects
+        changed here since the last save"""
+        for key, value in jo.items():
+            if key in self.__dirty:
+                continue
+            if value is None:
+                parents = self._parents(key)
+                if self._remove(key):
+                    self._changed(key.partition(".")[0], parents)
+                self.__versions.pop(key, None)
+                self.__fragments.pop(key, None)
+            elif self.__versions.get(key) != value.get("updated_at"):
+                parents = self._parents(key)
+                if self.__lazy:
+                    self._add_raw(key, value)
+                else:
+                    self._add(key, classes[value["__class__"]](**value))
+                self.__versions[key] = value.get("updated_at")
+                self._changed(value["__class__"],
+                              parents | self._parents(key))
+
+    def bulk_new(self, objs):
+        """sets in __objects every object of objs, then saves them all
+        with a single write and returns what save() returns"""
+        with self.__lock.write():
+            for obj in objs:
+                self.new(obj)
+        return self.save()
+
+    def bulk_update(self, cls, changes):
+        """sets the attributes of every dictionary of changes on the object
+        of cls with the id it holds under "id", then saves them all with
+        a single write and returns what save() returns
+
+        updated_at is set to now unless a dictionary gives it, and ids
+        matching no object are skipped. Dates may be given as to_dict()
+        writes them; ValueError is raised, before any object is changed,
+        when one is not a date.
+        """
+        name = _name_of(cls)
+        now = datetime.utcnow()
+        changes = [parse_dates(change) for change in changes]
+        with self.__lock.write():
+            for change in changes:
+                obj = self._lookup(name, "{}.{}".format(name, change["id"]))
+                if obj is None:
+                    continue
+                for attr, value in change.items():
+                    if attr not in ("id", "__class__", "created_at"):
+                        setattr(obj, attr, value)
+                if "updated_at" not in change:
+                    obj.updated_at = now
+                self.new(obj)
+        return self.save()
 
     def delete(self, obj=None):
         """delete obj from __objects if it’s inside"""
         if obj is not None:
             key = obj.__class__.__name__ + '.' + obj.id
-            if key in self.__objects:
-                del self.__objects[key]
+            with self.__lock.write():
+                parents = self._parents(key)
+                if self._remove(key):
+                    self.__dirty.add(key)
+                    self._changed(obj.__class__.__name__, parents)
+
+    def delete_all(self):
+        """removes every object from __objects and its indexes"""
+        with self.__lock.write():
+            self.__objects.clear()
+            self.__by_class.clear()
+            self.__refs.clear()
+            self.__ref_ids.clear()
+            self.__order.clear()
+            self.__positions.clear()
+            self.__dirty.clear()
+            self.__fragments.clear()
+            self.__raw.clear()
+            self.__versions.clear()
+            for name in classes:
+                self._changed(name)
+            FileStorage.__stamp = None
+            FileStorage.__log_offset = 0
+
+    def migrate(self):
+        """does nothing, the indexes of FileStorage live in memory, and
+        returns the empty list of indexes created"""
+        return []
 
     def close(self):
         """call reload() method for deserializing the JSON file to objects"""
@@ -72,13 +823,102 @@ class FileStorage:
     def get(self, cls, id):
         """ retrieves object based on class and ID """
         if cls and id:
-            fetch = "{}.{}".format(cls, id)
-            all_objects = self.all(cls)
-            return all_objects.get(fetch)
+            name = _name_of(cls)
+            with self.__lock.read():
+                return self._lookup(name, "{}.{}".format(name, id))
         else:
             return None
 
-    def count(self, cls=None):
-        """ counts all objects in storage """
-        return (len(self.all(cls)))
+    def exists(self, cls, id):
+        """tells if an object of cls has the given id, without building it"""
+        name = _name_of(cls)
+        key = "{}.{}".format(name, id)
+        with self.__lock.read(), self.__build_lock:
+            return (key in self.__by_class.get(name, {}) or
+                    key in self.__raw.get(name, {}))
+
+    def count(self, cls=None, **criteria):
+        """ counts all objects in storage, or those of cls whose attributes
+        match every attribute=value pair given in criteria """
+        if criteria:
+            if cls is None:
+                return sum([self.count(name, **criteria) for name in classes])
+            name = _name_of(cls)
+            with self.__lock.read(), self.__build_lock:
+                if len(criteria) == 1:
+                    keys = self._indexed_keys(name, criteria)
+                    if keys is not None:
+                        return len(keys)
+                return len(self.all(cls, **criteria))
+        with self.__lock.read(), self.__build_lock:
+            if cls is not None:
+                name = _name_of(cls)
+                return (len(self.__by_class.get(name, {})) +
+                        len(self.__raw.get(name, {})))
+            return (len(self.__objects) +
+                    sum([len(raws) for raws in self.__raw.values()]))
+
+    def page(self, cls, limit, after=None, **criteria):
+        """returns up to limit objects of cls whose attributes match
+        criteria, in the order of (created_at, id) and coming after the
+        position after, along with the position of the last one, or None
+        when no object comes after it
+
+        A position is a (created_at, id) tuple, created_at being written
+        as in to_dict(). The objects of a class are kept in that order,
+        so a page starts with a binary search. Raises ValueError when
+        limit is less than 1.
+        """
+        if limit < 1:
+            raise ValueError("limit must be at least 1")
+        name = _name_of(cls)
+        with self.__lock.read(), self.__build_lock:
+            keys = self._indexed_keys(name, criteria)
+            if keys is None:
+                order = self.__order.get(name, [])
+            else:
+                order = sorted([self.__positions[key] for key in keys])
+            i = bisect.bisect_right(order, tuple(after)) if after else 0
+            objs = []
+            for i in range(i, len(order)):
+                obj = self._lookup(name, "{}.{}".format(name, order[i][1]))
+                if obj is None or not _matches(obj, criteria):
+                    continue
+                if len(objs) == limit:
+                    return objs, order[last]
+                objs.append(obj)
+                last = i
+            return objs, None
+
+    def places_search(self, states=(), cities=(), amenities=()):
+        """returns the places in the cities of states or in cities, or
+        all of them when both are empty, that have every amenity of
+        amenities, combining the sets of keys of the indexes"""
+        with self.__lock.read(), self.__build_lock:
+            if states or cities:
+                city_ids = set(cities)
+                by_state = self.__refs.get(("City", "state_id"), {})
+                for state_id in set(states):
+                    city_ids.update([key.partition(".")[2]
+                                     for key in by_state.get(state_id, ())])
+                by_city = self.__refs.get(("Place", "city_id"), {})
+                keys = set()
+                for city_id in city_ids:
+                    keys.update(by_city.get(city_id, ()))
+            else:
+                keys = (set(self.__by_class.get("Place", ())) |
+                        set(self.__raw.get("Place", ())))
+            by_amenity = self.__refs.get(("Place", "amenity_ids"), {})
+            for places in sorted([by_amenity.get(amenity_id, set())
+                                  for amenity_id in set(amenities)],
+                                 key=len):
+                keys &= places
+            places = [self._lookup("Place", key) for key in keys]
+            return [place for place in places if place is not None]
 
+    def counts(self):
+        """returns the number of objects of every class, by class name"""
+        with self.__lock.read(), self.__build_lock:
+            return {name: (len(self.__by_class.get(name, {})) +
+                           len(self.__raw.get(name, {})))
+                    for name in classes}
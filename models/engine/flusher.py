@@ -0,0 +1,107 @@
+#!/usr/bin/python3
+"""
+Contains the SaveHandle and Flusher classes
+"""
+
+import threading
+import time
+
+
+class SaveHandle:
+    """tells when the changes of a call to save() reached the disk"""
+
+    def __init__(self, done=False):
+        """Instantiate a SaveHandle, pending unless done"""
+        self.__event = threading.Event()
+        self.__error = None
+        if done:
+            self.__event.set()
+
+    @property
+    def done(self):
+        """True once the changes were written, or failed to be"""
+        return self.__event.is_set()
+
+    def wait(self, timeout=None):
+        """blocks until the changes are written, or for timeout seconds,
+        tells if they were, and raises the error the write ran into"""
+        if not self.__event.wait(timeout):
+            return False
+        if self.__error is not None:
+            raise self.__error
+        return True
+
+    def finish(self, error=None):
+        """marks the changes as written, or as failed with error"""
+        self.__error = error
+        self.__event.set()
+
+
+class Flusher:
+    """calls write in a background thread at most once every interval
+    seconds, or as soon as batch saves are waiting for it"""
+
+    def __init__(self, write, interval, batch):
+        """Instantiate a Flusher for the function write"""
+        self.__write = write
+        self.__interval = interval
+        self.__batch = batch
+        self.__cond = threading.Condition()
+        # list - handles of the saves waiting to be written
+        self.__pending = []
+        # float - time at which the oldest pending save was submitted
+        self.__since = None
+        self.__thread = None
+
+    def submit(self):
+        """queues a save and returns its SaveHandle"""
+        handle = SaveHandle()
+        with self.__cond:
+            if not self.__pending:
+                self.__since = time.monotonic()
+            self.__pending.append(handle)
+            if self.__thread is None or not self.__thread.is_alive():
+                self.__thread = threading.Thread(target=self._run,
+                                                 daemon=True)
+                self.__thread.start()
+            if len(self.__pending) == 1 or \
+               len(self.__pending) >= self.__batch:
+                self.__cond.notify()
+        return handle
+
+    def flush(self):
+        """writes right away in the calling thread, covering every save
+        submitted so far"""
+        with self.__cond:
+            handles, self.__pending = self.__pending, []
+        self._drain(handles, force=True)
+
+    def _run(self):
+        """waits for saves and writes them, in the background thread"""
+        while True:
+            with self.__cond:
+                while True:
+                    if self.__pending:
+                        left = self.__since + self.__interval - \
+                            time.monotonic()
+                        if len(self.__pending) >= self.__batch or left <= 0:
+                            break
+                        self.__cond.wait(left)
+                    else:
+                        self.__cond.wait()
+                handles, self.__pending = self.__pending, []
+            self._drain(handles)
+
+    def _drain(self, handles, force=False):
+        """writes once for all handles and finishes them"""
+        if not handles and not force:
+            return
+        error = None
+        try:
+            self.__write()
+        except Exception as e:
+            error = e
+        for handle in handles:
+            handle.finish(error)
+        if error is not None and not handles:
+            raise error
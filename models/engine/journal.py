@@ -0,0 +1,107 @@
+#!/usr/bin/python3
+"""
+Contains the helpers FileStorage uses to keep its write-ahead log
+
+Every line of the log is a JSON object mapping <class name>.id keys to
+the dictionary of the object, or to null when the object was deleted.
+A line is written in one go by append(), so a crash can only leave an
+incomplete last line, which replay() ignores.
+"""
+
+import glob
+import json
+import os
+
+
+def append(path, text):
+    """appends the JSON object text as one line of the log at path and
+    returns the size of the log"""
+    line = text.replace("\n", " ") + "\n"
+    with open(path, "ab") as f:
+        f.write(line.encode("utf-8"))
+        f.flush()
+        os.fsync(f.fileno())
+        return f.tell()
+
+
+def replay(path, objects, offset=0):
+    """applies the lines of the log at path, from offset on, onto the
+    dictionary objects
+
+    Returns the offset right after the last complete line, which is the
+    size of the log unless its last write was cut short.
+    """
+    try:
+        with open(path, "rb") as f:
+            f.seek(offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                try:
+                    objects.update(json.loads(line.decode("utf-8")))
+                except ValueError:
+                    break
+                offset += len(line)
+    except FileNotFoundError:
+        pass
+    return offset
+
+
+def truncate(path, offset):
+    """drops whatever follows offset in the log at path"""
+    try:
+        if os.path.getsize(path) > offset:
+            with open(path, "r+b") as f:
+                f.truncate(offset)
+    except FileNotFoundError:
+        pass
+
+
+def rotate(path, old):
+    """moves the log at path to old so that a compaction can absorb it"""
+    if not os.path.exists(path):
+        return
+    if not os.path.exists(old):
+        os.replace(path, old)
+        return
+    # a compaction did not finish: keep its log and add this one to it
+    with open(path, "rb") as src, open(old, "ab") as dst:
+        dst.write(src.read())
+        dst.flush()
+        os.fsync(dst.fileno())
+    os.remove(path)
+
+
+def write_temp(path, text):
+    """writes text to a temporary file next to path and returns its path"""
+    tmp = "{}.{}.tmp".format(path, os.getpid())
+    with open(tmp, "w") as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+    return tmp
+
+
+def remove_temps(path):
+    """removes the temporary files next to path left by the processes
+    that stopped before renaming them"""
+    for tmp in glob.glob(glob.escape(path) + ".*.tmp"):
+        try:
+            os.remove(tmp)
+        except FileNotFoundError:
+            pass
+
+
+def write_atomic(path, text):
+    """writes text to path through a temporary file and a rename"""
+    os.replace(write_temp(path, text), path)
+
+
+def compact(path, tmp, old):
+    """moves the snapshot written to tmp over path, then drops the log
+    old that it absorbed"""
+    os.replace(tmp, path)
+    try:
+        os.remove(old)
+    except FileNotFoundError:
+        pass
@@ -0,0 +1,78 @@
+#!/usr/bin/python3
+"""
+Contains the TimedQueuePool class and the pool_options function
+"""
+
+from os import getenv
+import sqlalchemy
+from sqlalchemy.pool import QueuePool
+import threading
+import time
+
+
+def pool_options():
+    """returns the create_engine arguments set by HBNB_MYSQL_POOL_SIZE,
+    HBNB_MYSQL_MAX_OVERFLOW, HBNB_MYSQL_POOL_TIMEOUT (seconds),
+    HBNB_MYSQL_POOL_RECYCLE (seconds) and HBNB_MYSQL_POOL_PRE_PING"""
+    options = {}
+    settings = {"pool_size": ('HBNB_MYSQL_POOL_SIZE', int),
+                "max_overflow": ('HBNB_MYSQL_MAX_OVERFLOW', int),
+                "pool_timeout": ('HBNB_MYSQL_POOL_TIMEOUT', float),
+                "pool_recycle": ('HBNB_MYSQL_POOL_RECYCLE', int)}
+    for option, (name, convert) in settings.items():
+        if getenv(name):
+            options[option] = convert(getenv(name))
+    if getenv('HBNB_MYSQL_POOL_PRE_PING'):
+        options["pool_pre_ping"] = getenv('HBNB_MYSQL_POOL_PRE_PING') == "1"
+    return options
+
+
+class TimedQueuePool(QueuePool):
+    """QueuePool that also measures how long checkouts wait"""
+
+    def __init__(self, *args, **kwargs):
+        """Instantiate a TimedQueuePool, see QueuePool"""
+        super().__init__(*args, **kwargs)
+        self.__lock = threading.Lock()
+        # integer - number of connections checked out so far
+        self.__checkouts = 0
+        # integer - number of checkouts that gave up after the timeout
+        self.__timeouts = 0
+        # float - seconds spent by all checkouts waiting for a connection
+        self.__wait_total = 0.0
+        # float - longest wait of a single checkout, in seconds
+        self.__wait_max = 0.0
+
+    def _do_get(self):
+        """checks a connection out, timing how long it takes"""
+        start = time.monotonic()
+        timed_out = False
+        try:
+            return super()._do_get()
+        except sqlalchemy.exc.TimeoutError:
+            timed_out = True
+            raise
+        finally:
+            wait = time.monotonic() - start
+            with self.__lock:
+                self.__checkouts += 1
+                self.__timeouts += timed_out
+                self.__wait_total += wait
+                self.__wait_max = max(self.__wait_max, wait)
+
+    def stats(self):
+        """returns a dictionary of the live state of the pool and of the
+        waits of its checkouts"""
+        with self.__lock:
+            checkouts = self.__checkouts
+            return {"size": self.size(),
+                    "checked_in": self.checkedin(),
+                    "checked_out": self.checkedout(),
+                    "overflow": max(self.overflow(), 0),
+                    "timeout": self.timeout(),
+                    "checkouts": checkouts,
+                    "timeouts": self.__timeouts,
+                    "wait_total": self.__wait_total,
+                    "wait_max": self.__wait_max,
+                    "wait_avg": (self.__wait_total / checkouts
+                                 if checkouts else 0.0)}
@@ -0,0 +1,89 @@
+#!/usr/bin/python3
+"""
+Contains the ReadWriteLock class
+"""
+
+from contextlib import contextmanager
+import threading
+
+
+class ReadWriteLock:
+    """lets many threads read at the same time, or a single thread write
+
+    Both sides are reentrant, and the thread holding the write side may
+    also read. Waiting writers go before new readers so that a steady
+    flow of readers cannot starve them.
+    """
+
+    def __init__(self):
+        """Instantiate an unlocked ReadWriteLock"""
+        self.__cond = threading.Condition(threading.Lock())
+        # dictionary - read depth by thread ident
+        self.__readers = {}
+        # integer - ident of the thread holding the write side, if any
+        self.__writer = None
+        # integer - write depth of that thread
+        self.__depth = 0
+        # integer - number of threads waiting for the write side
+        self.__waiting = 0
+
+    def acquire_read(self):
+        """blocks until the calling thread may read"""
+        me = threading.get_ident()
+        with self.__cond:
+            if self.__writer != me and me not in self.__readers:
+                while self.__writer is not None or self.__waiting:
+                    self.__cond.wait()
+            self.__readers[me] = self.__readers.get(me, 0) + 1
+
+    def release_read(self):
+        """gives back one level of read access of the calling thread"""
+        me = threading.get_ident()
+        with self.__cond:
+            if self.__readers[me] == 1:
+                del self.__readers[me]
+                self.__cond.notify_all()
+            else:
+                self.__readers[me] -= 1
+
+    def acquire_write(self):
+        """blocks until the calling thread is the only one in the lock"""
+        me = threading.get_ident()
+        with self.__cond:
+            if self.__writer == me:
+                self.__depth += 1
+                return
+            if me in self.__readers:
+                raise RuntimeError("cannot write while holding a read lock")
+            self.__waiting += 1
+            while self.__writer is not None or self.__readers:
+                self.__cond.wait()
+            self.__waiting -= 1
+            self.__writer = me
+            self.__depth = 1
+
+    def release_write(self):
+        """gives back one level of write access of the calling thread"""
+        with self.__cond:
+            self.__depth -= 1
+            if self.__depth == 0:
+                self.__writer = None
+                self.__cond.notify_all()
+
+    @contextmanager
+    def read(self):
+        """context manager holding the read side"""
+        self.acquire_read()
+        try:
+            yield self
+        finally:
+            self.release_read()
+
+    @contextmanager
+    def write(self):
+        """context manager holding the write side"""
+        self.acquire_write()
+        try:
+            yield self
+        finally:
+            self.release_write()
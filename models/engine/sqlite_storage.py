@@ -0,0 +1,40 @@
+#!/usr/bin/python3
+"""
+Contains the class SQLiteStorage
+"""
+
+from models.engine.db_storage import DBStorage
+from models.engine.pool import TimedQueuePool
+from os import getenv
+import sqlalchemy
+from sqlalchemy.pool import StaticPool
+
+
+class SQLiteStorage(DBStorage):
+    """stores the models in an SQLite database file, without a server"""
+
+    def _engine_url(self):
+        """returns the URL of the database file (path: HBNB_SQLITE_DB)"""
+        return 'sqlite:///{}'.format(getenv('HBNB_SQLITE_DB', 'hbnb.db'))
+
+    def _engine_options(self):
+        """lets the threads share the connections, and a single one when
+        the database lives in memory"""
+        options = {"connect_args": {"check_same_thread": False},
+                   "poolclass": TimedQueuePool}
+        if getenv('HBNB_SQLITE_DB') == ':memory:':
+            options["poolclass"] = StaticPool
+        return options
+
+    def _configure(self, engine):
+        """turns on the write-ahead log and the foreign keys on every
+        connection of engine"""
+
+        @sqlalchemy.event.listens_for(engine, "connect")
+        def pragmas(connection, record):
+            """runs the pragmas on a new connection"""
+            cursor = connection.cursor()
+            cursor.execute("PRAGMA journal_mode=WAL")
+            cursor.execute("PRAGMA synchronous=NORMAL")
+            cursor.execute("PRAGMA foreign_keys=ON")
+            cursor.close()
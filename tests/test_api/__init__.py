@@ -0,0 +1,43 @@
+#!/usr/bin/python3
+"""
+Contains the APITestCase class
+"""
+
+from api.v1.app import app
+from api.v1.views.cache import cache
+import models
+from models import storage
+from models.engine.file_storage import FileStorage
+import os
+import tempfile
+import unittest
+
+
+class APITestCase(unittest.TestCase):
+    """Base for the tests sending requests to the API, which run on an
+    empty temporary file when testing file storage"""
+    def setUp(self):
+        """Creates the client and empties the storage and the cache"""
+        self.client = app.test_client()
+        cache.clear()
+        if models.storage_t != 'db':
+            self.saved = dict(storage.all())
+            storage.delete_all()
+            self.tmp = tempfile.TemporaryDirectory()
+            FileStorage._FileStorage__file_path = os.path.join(
+                self.tmp.name, "file.json")
+
+    def tearDown(self):
+        """Restores the storage and empties the cache"""
+        if models.storage_t != 'db':
+            FileStorage._FileStorage__file_path = "file.json"
+            storage.delete_all()
+            for obj in self.saved.values():
+                storage.new(obj)
+            self.tmp.cleanup()
+        cache.clear()
+
+    def create(self, obj):
+        """Saves obj and returns it"""
+        obj.save()
+        return obj
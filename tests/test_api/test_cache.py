@@ -0,0 +1,292 @@
+#!/usr/bin/python3
+"""
+Contains the TestCacheDocs, TestResponseCache and TestCachedViews classes
+"""
+
+from api.v1.app import app
+from api.v1.views.cache import ResponseCache, cache
+from flask import Response, request
+import inspect
+import models
+from models import storage
+from models.city import City
+from models.state import State
+import pep8
+from tests.test_api import APITestCase
+import unittest
+
+# the package api.v1.views has an attribute cache, the ResponseCache
+cache_module = inspect.getmodule(ResponseCache)
+
+
+class TestCacheDocs(unittest.TestCase):
+    """Tests to check the documentation and style of cache.py"""
+    def test_pep8_conformance_cache(self):
+        """Test that api/v1/views/cache.py conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['api/v1/views/cache.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_pep8_conformance_test_cache(self):
+        """Test that tests/test_api/test_cache.py conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['tests/test_api/test_cache.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_cache_module_docstring(self):
+        """Test for the cache.py module docstring"""
+        self.assertIsNot(cache_module.__doc__, None,
+                         "cache.py needs a docstring")
+
+    def test_cache_class_docstring(self):
+        """Test for the ResponseCache class docstring"""
+        self.assertIsNot(ResponseCache.__doc__, None,
+                         "ResponseCache class needs a docstring")
+
+    def test_cache_func_docstrings(self):
+        """Test for the presence of docstrings in cache functions"""
+        functions = inspect.getmembers(cache_module, inspect.isfunction)
+        functions += inspect.getmembers(ResponseCache, inspect.isfunction)
+        for func in functions:
+            if func[1].__module__ == cache_module.__name__:
+                self.assertIsNot(func[1].__doc__, None,
+                                 "{:s} needs a docstring".format(func[0]))
+
+
+class TestResponseCache(unittest.TestCase):
+    """Test the ResponseCache class"""
+    def put(self, cache, key, body=b"body", depends=(), invalidations=None):
+        """Puts a response of body under key and sends it"""
+        if invalidations is None:
+            invalidations = cache.invalidations()
+        response = Response(body, headers={"ETag": '"{}"'.format(key)})
+        response = cache.put(key, response, list(depends), invalidations)
+        self.assertEqual(response.get_data(), body)
+        return response
+
+    def test_hit(self):
+        """Test that a sent response is given back whole"""
+        cache = ResponseCache(2)
+        self.assertIsNone(cache.get("a"))
+        self.put(cache, "a", b"first")
+        response = cache.get("a")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_data(), b"first")
+        self.assertEqual(response.headers["ETag"], '"a"')
+        self.assertEqual(cache.get("a").get_data(), b"first")
+
+    def test_unsent(self):
+        """Test that a response is only kept once its body is sent"""
+        cache = ResponseCache(2)
+        cache.put("a", Response(b"body"), [], cache.invalidations())
+        self.assertIsNone(cache.get("a"))
+
+    def test_lru(self):
+        """Test that the least recently used response makes room"""
+        cache = ResponseCache(2)
+        self.put(cache, "a")
+        self.put(cache, "b")
+        cache.get("a")
+        self.put(cache, "c")
+        self.assertIsNotNone(cache.get("a"))
+        self.assertIsNone(cache.get("b"))
+        self.assertIsNotNone(cache.get("c"))
+        self.assertEqual(cache.stats()["entries"], 2)
+        self.assertEqual(cache.stats()["evictions"], 1)
+
+    def test_invalidate(self):
+        """Test that a change drops the responses read from its class and
+        its parents only"""
+        cache = ResponseCache(10)
+        self.put(cache, "states", depends=[("State", None, None)])
+        self.put(cache, "cities 1", depends=[("City", "state_id", "1"),
+                                             ("State", "id", "1")])
+        self.put(cache, "cities 2", depends=[("City", "state_id", "2"),
+                                             ("State", "id", "2")])
+        cache.invalidate("City", {("state_id", "1"), ("id", "c")})
+        self.assertIsNone(cache.get("cities 1"))
+        self.assertIsNotNone(cache.get("cities 2"))
+        self.assertIsNotNone(cache.get("states"))
+        cache.invalidate("State", {("id", "2")})
+        self.assertIsNone(cache.get("cities 2"))
+        self.assertIsNone(cache.get("states"))
+        self.assertEqual(cache.stats()["entries"], 0)
+
+    def test_invalidate_any(self):
+        """Test that a change of unknown objects drops every response read
+        from the class"""
+        cache = ResponseCache(10)
+        self.put(cache, "cities 1", depends=[("City", "state_id", "1")])
+        self.put(cache, "cities 2", depends=[("City", "state_id", "2")])
+        self.put(cache, "users", depends=[("User", None, None)])
+        cache.invalidate("City", None)
+        self.assertIsNone(cache.get("cities 1"))
+        self.assertIsNone(cache.get("cities 2"))
+        self.assertIsNotNone(cache.get("users"))
+
+    def test_overlapping_invalidation(self):
+        """Test that a response made while a change happened is not
+        kept"""
+        cache = ResponseCache(10)
+        before = cache.invalidations()
+        cache.invalidate("Review", None)
+        self.put(cache, "a", depends=[("State", None, None)],
+                 invalidations=before)
+        self.assertIsNone(cache.get("a"))
+        response = Response(b"body")
+        response = cache.put("b", response, [], cache.invalidations())
+        cache.invalidate("Review", None)
+        self.assertEqual(response.get_data(), b"body")
+        self.assertIsNone(cache.get("b"))
+
+    def test_entry_size(self):
+        """Test that bodies over the size of an entry are not kept"""
+        cache = ResponseCache(10)
+        self.put(cache, "fits", b"x" * 1024 ** 2)
+        self.put(cache, "large", b"x" * (1024 ** 2 + 1))
+        self.assertIsNotNone(cache.get("fits"))
+        self.assertIsNone(cache.get("large"))
+        small = ResponseCache(10, entry_size=4)
+        self.put(small, "a", b"abcde")
+        self.assertIsNone(small.get("a"))
+
+    def test_disabled(self):
+        """Test that a cache of size 0 keeps nothing"""
+        cache = ResponseCache(0)
+        response = Response(b"body")
+        self.assertIs(cache.put("a", response, [], 0), response)
+        self.assertEqual(response.get_data(), b"body")
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(cache.stats()["entries"], 0)
+
+    def test_validators(self):
+        """Test that a hit answers 304 to the validators it was kept
+        with"""
+        cache = ResponseCache(2)
+        self.put(cache, "a")
+        with app.test_request_context(headers={"If-None-Match": '"a"'}):
+            response = cache.get("a").make_conditional(request)
+            self.assertEqual(response.status_code, 304)
+        with app.test_request_context(headers={"If-None-Match": '"b"'}):
+            response = cache.get("a").make_conditional(request)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.get_data(), b"body")
+
+    def test_versions(self):
+        """Test that a response is only found under its versions"""
+        cache = ResponseCache(2)
+        response = cache.put("a", Response(b"body"), [],
+                             cache.invalidations(), ("1", "7"))
+        response.get_data()
+        self.assertIsNotNone(cache.get("a", ("1", "7")))
+        self.assertIsNone(cache.get("a", ("1", "8")))
+        self.assertIsNone(cache.get("a", ("1", "7")))
+        self.assertEqual(cache.stats()["entries"], 0)
+
+    def test_stats(self):
+        """Test the counters of the cache"""
+        cache = ResponseCache(1)
+        cache.get("a")
+        self.put(cache, "a")
+        cache.get("a")
+        cache.get("a")
+        self.put(cache, "b")
+        cache.invalidate("State", None)
+        self.assertEqual(cache.stats(), {"entries": 1, "size": 1,
+                                         "hits": 2, "misses": 1,
+                                         "hit_ratio": 2 / 3,
+                                         "evictions": 1,
+                                         "invalidations": 1})
+        cache.clear()
+        self.assertEqual(cache.stats()["entries"], 0)
+        self.assertEqual(cache.stats()["invalidations"], 2)
+
+
+class TestCachedViews(APITestCase):
+    """Test the cache of the views over HTTP"""
+    def setUp(self):
+        """Creates two states with a city each"""
+        super().setUp()
+        self.states = [self.create(State(name="State {}".format(i)))
+                       for i in range(2)]
+        self.cities = [self.create(City(name="City", state_id=state.id))
+                       for state in self.states]
+        self.urls = ['/api/v1/states/{}/cities'.format(state.id)
+                     for state in self.states]
+
+    def get(self, url, **headers):
+        """Returns the response to a GET of url, read to its end, and
+        whether it came from the cache"""
+        hits = cache.stats()["hits"]
+        response = self.client.get(url, headers=headers)
+        response.get_data()
+        response.close()
+        return response, cache.stats()["hits"] > hits
+
+    def test_hit(self):
+        """Test that a list is read from the cache the second time"""
+        first, hit = self.get(self.urls[0])
+        self.assertFalse(hit)
+        second, hit = self.get(self.urls[0])
+        self.assertTrue(hit)
+        self.assertEqual(second.get_json(), first.get_json())
+        self.assertEqual(second.headers["ETag"], first.headers["ETag"])
+
+    def test_validators(self):
+        """Test that a hit answers 304 to the ETag of the list"""
+        response, hit = self.get(self.urls[0])
+        response, hit = self.get(self.urls[0], **{
+            "If-None-Match": response.headers["ETag"]})
+        self.assertTrue(hit)
+        self.assertEqual(response.status_code, 304)
+
+    def test_city_write(self):
+        """Test that a City write drops the cities of its state only"""
+        for url in self.urls:
+            self.get(url)
+        response = self.client.put('/api/v1/cities/{}'.format(
+            self.cities[0].id), json={"name": "Renamed"})
+        self.assertEqual(response.status_code, 200)
+        response, hit = self.get(self.urls[0])
+        self.assertFalse(hit)
+        self.assertEqual([city["name"] for city in response.get_json()],
+                         ["Renamed"])
+        response, hit = self.get(self.urls[1])
+        self.assertEqual(hit, models.storage_t != 'db')
+        self.assertEqual([city["name"] for city in response.get_json()],
+                         ["City"])
+
+    def test_city_added(self):
+        """Test that a City added to a state drops the cities of that
+        state only"""
+        for url in self.urls:
+            self.get(url)
+        response = self.client.post(self.urls[1], json={"name": "New"})
+        self.assertEqual(response.status_code, 201)
+        response, hit = self.get(self.urls[1])
+        self.assertFalse(hit)
+        self.assertEqual(len(response.get_json()), 2)
+        response, hit = self.get(self.urls[0])
+        self.assertEqual(hit, models.storage_t != 'db')
+        self.assertEqual(len(response.get_json()), 1)
+
+    @unittest.skipIf(models.storage_t != 'db', "not testing db storage")
+    def test_other_process(self):
+        """Test that a commit this process is not told of drops the
+        responses read from its class"""
+        storage.unsubscribe(cache.invalidate)
+        try:
+            self.get(self.urls[0])
+            self.create(City(name="Unheard", state_id=self.states[0].id))
+        finally:
+            storage.subscribe(cache.invalidate)
+        response, hit = self.get(self.urls[0])
+        self.assertFalse(hit)
+        self.assertEqual(len(response.get_json()), 2)
+        self.assertEqual(cache.stats()["entries"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,170 @@
+#!/usr/bin/python3
+"""
+Contains the TestConditionalDocs, TestObjectResponse and TestListVersions
+classes
+"""
+
+from api.v1.views import conditional
+from datetime import datetime, timedelta, timezone
+import inspect
+from models import storage
+from models.state import State
+import pep8
+from tests.test_api import APITestCase
+import unittest
+from unittest import mock
+from werkzeug.http import http_date
+
+
+class TestConditionalDocs(unittest.TestCase):
+    """Tests to check the documentation and style of conditional.py"""
+    def test_pep8_conformance_conditional(self):
+        """Test that api/v1/views/conditional.py conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['api/v1/views/conditional.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_pep8_conformance_test_conditional(self):
+        """Test that tests/test_api/test_conditional.py conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['tests/test_api/test_conditional.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_conditional_module_docstring(self):
+        """Test for the conditional.py module docstring"""
+        self.assertIsNot(conditional.__doc__, None,
+                         "conditional.py needs a docstring")
+
+    def test_conditional_func_docstrings(self):
+        """Test for the presence of docstrings in conditional functions"""
+        for func in inspect.getmembers(conditional, inspect.isfunction):
+            if func[1].__module__ == conditional.__name__:
+                self.assertIsNot(func[1].__doc__, None,
+                                 "{:s} needs a docstring".format(func[0]))
+
+
+class TestObjectResponse(APITestCase):
+    """Test the conditional GETs of a single object"""
+    def setUp(self):
+        """Creates a state"""
+        super().setUp()
+        self.state = self.create(State(name="Conditional"))
+        self.url = '/api/v1/states/{}'.format(self.state.id)
+
+    def age(self, obj, **delta):
+        """Moves updated_at of obj back by delta and saves it"""
+        obj.updated_at = datetime.utcnow() - timedelta(**delta)
+        storage.new(obj)
+        storage.save()
+
+    def test_if_none_match(self):
+        """Test that the ETag answers 304 until the object changes"""
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        etag = response.headers["ETag"]
+        response = self.client.get(self.url, headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.data, b"")
+        self.assertEqual(response.headers["ETag"], etag)
+        self.client.put(self.url, json={"name": "Changed"})
+        response = self.client.get(self.url, headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json()["name"], "Changed")
+        self.assertNotEqual(response.headers["ETag"], etag)
+
+    def test_if_modified_since(self):
+        """Test that Last-Modified answers 304 until the object changes"""
+        self.age(self.state, minutes=5)
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        modified = response.headers["Last-Modified"]
+        response = self.client.get(self.url,
+                                   headers={"If-Modified-Since": modified})
+        self.assertEqual(response.status_code, 304)
+        earlier = http_date(self.state.updated_at - timedelta(seconds=1))
+        response = self.client.get(self.url,
+                                   headers={"If-Modified-Since": earlier})
+        self.assertEqual(response.status_code, 200)
+        self.age(self.state, minutes=1)
+        response = self.client.get(self.url,
+                                   headers={"If-Modified-Since": modified})
+        self.assertEqual(response.status_code, 200)
+
+    def test_same_second(self):
+        """Test that a change of the current second has no Last-Modified
+        and is not held fresh by If-Modified-Since"""
+        now = datetime.utcnow().replace(microsecond=500000)
+        self.state.updated_at = now
+        storage.new(self.state)
+        storage.save()
+        with mock.patch.object(conditional, "datetime") as clock:
+            clock.now.return_value = now.replace(microsecond=900000,
+                                                 tzinfo=timezone.utc)
+            response = self.client.get(self.url, headers={
+                "If-Modified-Since": http_date(now)})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn("Last-Modified", response.headers)
+        self.assertIn("ETag", response.headers)
+
+    def test_if_none_match_first(self):
+        """Test that If-Modified-Since is ignored along If-None-Match"""
+        self.age(self.state, minutes=5)
+        response = self.client.get(self.url)
+        response = self.client.get(self.url, headers={
+            "If-None-Match": '"other"',
+            "If-Modified-Since": response.headers["Last-Modified"]})
+        self.assertEqual(response.status_code, 200)
+
+
+class TestListVersions(APITestCase):
+    """Test the conditional GETs of the lists"""
+    def setUp(self):
+        """Creates a state"""
+        super().setUp()
+        self.create(State(name="Listed"))
+
+    def get(self, url, **headers):
+        """Returns the response to a GET of url, read to its end so that
+        a streamed body lets go of its request context"""
+        response = self.client.get(url, headers=headers)
+        response.get_data()
+        response.close()
+        return response
+
+    def check(self, url):
+        """Checks that url answers 304 to its ETag until a state is
+        added"""
+        response = self.get(url)
+        self.assertEqual(response.status_code, 200)
+        etag = response.headers["ETag"]
+        response = self.get(url, **{"If-None-Match": etag})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.data, b"")
+        self.client.post('/api/v1/states', json={"name": "Added"})
+        response = self.get(url, **{"If-None-Match": etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.headers["ETag"], etag)
+
+    def test_stream(self):
+        """Test the versions of the streamed list"""
+        self.check('/api/v1/states')
+
+    def test_page(self):
+        """Test the versions of a page"""
+        self.check('/api/v1/states?limit=1')
+
+    def test_media_types(self):
+        """Test that JSON and NDJSON lists have ETags of their own"""
+        json = self.get('/api/v1/states')
+        ndjson = self.get('/api/v1/states', Accept="application/x-ndjson")
+        self.assertNotEqual(json.headers["ETag"], ndjson.headers["ETag"])
+        response = self.get('/api/v1/states', **{
+            "Accept": "application/x-ndjson",
+            "If-None-Match": json.headers["ETag"]})
+        self.assertEqual(response.status_code, 200)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,188 @@
+#!/usr/bin/python3
+"""
+Contains the TestPagingDocs, TestPaging and TestStreaming classes
+"""
+
+from api.v1.views import paging
+from api.v1.views.cache import cache
+import inspect
+import json
+from models.city import City
+from models.state import State
+import pep8
+from tests.test_api import APITestCase
+import unittest
+from unittest import mock
+
+
+class TestPagingDocs(unittest.TestCase):
+    """Tests to check the documentation and style of paging.py"""
+    def test_pep8_conformance_paging(self):
+        """Test that api/v1/views/paging.py conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['api/v1/views/paging.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_pep8_conformance_test_paging(self):
+        """Test that tests/test_api/test_paging.py conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['tests/test_api/test_paging.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_paging_module_docstring(self):
+        """Test for the paging.py module docstring"""
+        self.assertIsNot(paging.__doc__, None, "paging.py needs a docstring")
+
+    def test_paging_func_docstrings(self):
+        """Test for the presence of docstrings in paging functions"""
+        for func in inspect.getmembers(paging, inspect.isfunction):
+            if func[1].__module__ == paging.__name__:
+                self.assertIsNot(func[1].__doc__, None,
+                                 "{:s} needs a docstring".format(func[0]))
+
+
+class TestPaging(APITestCase):
+    """Test the ?limit= and ?cursor= of the list endpoints"""
+    def setUp(self):
+        """Creates a state with 7 cities"""
+        super().setUp()
+        self.state = self.create(State(name="Paged"))
+        self.cities = [self.create(City(name="City {}".format(i),
+                                        state_id=self.state.id))
+                       for i in range(7)]
+        self.url = '/api/v1/states/{}/cities'.format(self.state.id)
+
+    def walk(self, url, limit):
+        """Returns the pages read one after the other from url"""
+        pages = []
+        cursor = None
+        while True:
+            query = {"limit": limit}
+            if cursor:
+                query["cursor"] = cursor
+            response = self.client.get(url, query_string=query)
+            self.assertEqual(response.status_code, 200)
+            body = response.get_json()
+            self.assertEqual(set(body), {"results", "next"})
+            pages.append([obj["id"] for obj in body["results"]])
+            cursor = body["next"]
+            if cursor is None:
+                return pages
+
+    def test_walk(self):
+        """Test that the pages hold every object once, in order"""
+        ids = [city.id for city in sorted(
+            self.cities, key=lambda city: (city.created_at, city.id))]
+        pages = self.walk(self.url, 3)
+        self.assertEqual([len(page) for page in pages], [3, 3, 1])
+        self.assertEqual(sum(pages, []), ids)
+        self.assertEqual(self.walk(self.url, 7), [ids])
+        states = sum(self.walk('/api/v1/states', 1), [])
+        self.assertIn(self.state.id, states)
+        self.assertEqual(len(states), len(set(states)))
+
+    def test_cursor_only(self):
+        """Test that a cursor without limit reads the default limit"""
+        response = self.client.get(self.url, query_string={"cursor": ""})
+        self.assertEqual(len(response.get_json()["results"]), 7)
+        self.assertIsNone(response.get_json()["next"])
+
+    def test_cursor_round_trip(self):
+        """Test that a cursor decodes to the position it encodes"""
+        position = ("2020-01-01T00:00:00.000000", "some-id")
+        cursor = paging.encode_cursor(position)
+        with self.client.application.test_request_context():
+            self.assertEqual(paging.decode_cursor(cursor), position)
+
+    def test_invalid_cursor(self):
+        """Test that a cursor not made by the API is rejected"""
+        for cursor in ["zzz", paging.encode_cursor(["a"]),
+                       "WyJhIiwgMV0=", "!!", paging.encode_cursor(["x", "y"]),
+                       paging.encode_cursor(["2017-09-28", "y"])]:
+            response = self.client.get(self.url,
+                                       query_string={"cursor": cursor})
+            self.assertEqual(response.status_code, 400, cursor)
+            self.assertEqual(response.get_json(),
+                             {"error": "Invalid cursor"})
+
+    def test_invalid_limit(self):
+        """Test that a limit that is not a positive integer is rejected"""
+        for limit in ["abc", "0", "-1", "1.5", ""]:
+            response = self.client.get(self.url,
+                                       query_string={"limit": limit})
+            self.assertEqual(response.status_code, 400, limit)
+            self.assertEqual(response.get_json(), {"error": "Invalid limit"})
+
+
+class TestStreaming(APITestCase):
+    """Test the streamed JSON and NDJSON lists"""
+    def setUp(self):
+        """Creates a state without cities and one with 5 cities"""
+        super().setUp()
+        self.empty = self.create(State(name="Empty"))
+        self.state = self.create(State(name="Streamed"))
+        self.cities = [self.create(City(name="City {}".format(i),
+                                        state_id=self.state.id))
+                       for i in range(5)]
+        self.url = '/api/v1/states/{}/cities'.format(self.state.id)
+
+    def get(self, url, accept=None):
+        """Returns the response to a GET of url and its chunks"""
+        headers = {"Accept": accept} if accept else {}
+        cache.clear()
+        response = self.client.get(url, headers=headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.is_streamed)
+        chunks = list(response.response)
+        return response, chunks
+
+    def test_json_array(self):
+        """Test that the body is a JSON array, whatever its chunks"""
+        ids = {city.id for city in self.cities}
+        for chunk_size, chunks in [(64 * 1024, 1), (1, 6)]:
+            with mock.patch.object(paging, "chunk_size", chunk_size):
+                response, body = self.get(self.url)
+            self.assertEqual(len(body), chunks)
+            self.assertEqual(response.mimetype, "application/json")
+            cities = json.loads(b"".join(body))
+            self.assertEqual({city["id"] for city in cities}, ids)
+
+    def test_empty(self):
+        """Test that an empty list streams an empty array"""
+        for chunk_size in (1, 64 * 1024):
+            with mock.patch.object(paging, "chunk_size", chunk_size):
+                response, body = self.get(
+                    '/api/v1/states/{}/cities'.format(self.empty.id))
+            self.assertEqual(json.loads(b"".join(body)), [])
+
+    def test_ndjson(self):
+        """Test that NDJSON holds one object per line"""
+        with mock.patch.object(paging, "chunk_size", 1):
+            response, body = self.get(self.url, "application/x-ndjson")
+        self.assertEqual(response.mimetype, "application/x-ndjson")
+        lines = b"".join(body).decode().splitlines()
+        self.assertEqual({json.loads(line)["id"] for line in lines},
+                         {city.id for city in self.cities})
+        response, body = self.get(
+            '/api/v1/states/{}/cities'.format(self.empty.id),
+            "application/x-ndjson")
+        self.assertEqual(b"".join(body), b"")
+
+    def test_negotiation(self):
+        """Test that JSON is preferred unless NDJSON ranks higher"""
+        for accept, mimetype in [
+                (None, "application/json"),
+                ("*/*", "application/json"),
+                ("application/json, application/x-ndjson;q=0.5",
+                 "application/json"),
+                ("application/json;q=0.5, application/x-ndjson",
+                 "application/x-ndjson")]:
+            response, body = self.get(self.url, accept)
+            self.assertEqual(response.mimetype, mimetype, accept)
+            self.assertIn("Accept", response.vary)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,110 @@
+#!/usr/bin/python3
+"""
+Contains the TestPlacesDocs and TestPlacesSearch classes
+"""
+
+from api.v1.views import places
+import models
+from models.amenity import Amenity
+from models.city import City
+from models.place import Place
+from models.state import State
+from models.user import User
+import pep8
+from tests.test_api import APITestCase
+import unittest
+
+
+class TestPlacesDocs(unittest.TestCase):
+    """Tests to check the style of the places views"""
+    def test_pep8_conformance_test_places(self):
+        """Test that tests/test_api/test_places.py conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['tests/test_api/test_places.py',
+                                    'tests/test_api/__init__.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_places_search_docstring(self):
+        """Test for the places_search docstring"""
+        self.assertIsNot(places.places_search.__doc__, None,
+                         "places_search needs a docstring")
+
+
+class TestPlacesSearch(APITestCase):
+    """Test POST /api/v1/places_search"""
+    def setUp(self):
+        """Creates two states with a city and a place each"""
+        super().setUp()
+        user = self.create(User(email="search@hbnb.io", password="pwd"))
+        self.wifi = self.create(Amenity(name="Wifi"))
+        self.pool = self.create(Amenity(name="Pool"))
+        self.states = [self.create(State(name="Search {}".format(i)))
+                       for i in range(2)]
+        self.cities = [self.create(City(name="City", state_id=state.id))
+                       for state in self.states]
+        self.places = [Place(name="Place", city_id=city.id,
+                             user_id=user.id) for city in self.cities]
+        if models.storage_t == 'db':
+            self.places[0].amenities.extend([self.wifi, self.pool])
+            self.places[1].amenities.append(self.wifi)
+        else:
+            self.places[0].amenities = self.wifi
+            self.places[0].amenities = self.pool
+            self.places[1].amenities = self.wifi
+        for place in self.places:
+            self.create(place)
+
+    def search(self, body):
+        """Returns the response to a search"""
+        return self.client.post('/api/v1/places_search', json=body)
+
+    def ids(self, body):
+        """Returns the set of ids of the places found"""
+        response = self.search(body)
+        self.assertEqual(response.status_code, 200)
+        return {place["id"] for place in response.get_json()}
+
+    def test_empty(self):
+        """Test that an empty search returns every place"""
+        ids = {place.id for place in self.places}
+        self.assertTrue(ids <= self.ids({}))
+        self.assertTrue(ids <= self.ids({"states": [], "cities": []}))
+
+    def test_states_cities_amenities(self):
+        """Test that states and cities add up and amenities narrow down"""
+        self.assertEqual(self.ids({"states": [self.states[0].id]}),
+                         {self.places[0].id})
+        self.assertEqual(self.ids({"states": [self.states[0].id],
+                                   "cities": [self.cities[1].id]}),
+                         {place.id for place in self.places})
+        self.assertEqual(self.ids({"cities": [self.cities[1].id],
+                                   "amenities": [self.pool.id]}), set())
+        self.assertEqual(self.ids({"states": [s.id for s in self.states],
+                                   "amenities": [self.wifi.id,
+                                                 self.pool.id]}),
+                         {self.places[0].id})
+
+    def test_not_a_json(self):
+        """Test that a body that is not a JSON object is rejected"""
+        for response in [
+                self.client.post('/api/v1/places_search', data="states"),
+                self.search([])]:
+            self.assertEqual(response.status_code, 400)
+            self.assertEqual(response.get_json(), {"error": "Not a JSON"})
+
+    def test_not_a_list(self):
+        """Test that fields that are not lists of ids are rejected"""
+        for body, error in [({"states": "x"}, "Not a list: states"),
+                            ({"cities": {"x": 1}}, "Not a list: cities"),
+                            ({"states": [{"x": 1}]},
+                             "Not a list of ids: states"),
+                            ({"amenities": [1]},
+                             "Not a list of ids: amenities")]:
+            response = self.search(body)
+            self.assertEqual(response.status_code, 400)
+            self.assertEqual(response.get_json(), {"error": error})
+
+
+if __name__ == "__main__":
+    unittest.main()
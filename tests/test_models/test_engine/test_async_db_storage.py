@@ -0,0 +1,97 @@
+#!/usr/bin/python3
+"""
+Contains the TestAsyncDBStorageDocs and TestAsyncDBStorage classes
+"""
+
+import asyncio
+import inspect
+import models
+import pep8
+import unittest
+try:
+    from models.engine import async_db_storage
+except ImportError:
+    async_db_storage = None
+
+
+@unittest.skipIf(async_db_storage is None,
+                 "the asyncio extension of SQLAlchemy is not installed")
+class TestAsyncDBStorageDocs(unittest.TestCase):
+    """Tests to check the documentation and style of AsyncDBStorage"""
+    @classmethod
+    def setUpClass(cls):
+        """Set up for the doc tests"""
+        cls.adbs_f = [func for func in inspect.getmembers(
+            async_db_storage.AsyncDBStorage, inspect.isfunction)]
+
+    def test_pep8_conformance_async_db_storage(self):
+        """Test that models/engine/async_db_storage.py conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['models/engine/async_db_storage.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_async_db_storage_module_docstring(self):
+        """Test for the async_db_storage.py module docstring"""
+        self.assertIsNot(async_db_storage.__doc__, None,
+                         "async_db_storage.py needs a docstring")
+
+    def test_async_db_storage_class_docstring(self):
+        """Test for the AsyncDBStorage class docstring"""
+        self.assertIsNot(async_db_storage.AsyncDBStorage.__doc__, None,
+                         "AsyncDBStorage class needs a docstring")
+
+    def test_async_db_storage_func_docstrings(self):
+        """Test for the presence of docstrings in AsyncDBStorage methods"""
+        for func in self.adbs_f:
+            self.assertIsNot(func[1].__doc__, None,
+                             "{:s} method needs a docstring".format(func[0]))
+
+
+class TestAsyncDBStorageStyle(unittest.TestCase):
+    """Tests to check the style of the AsyncDBStorage tests"""
+    def test_pep8_conformance_test_async_db_storage(self):
+        """Test tests/test_models/test_engine/test_async_db_storage.py"""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['tests/test_models/test_engine/\
+test_async_db_storage.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+
+@unittest.skipIf(async_db_storage is None or models.storage_name != 'db',
+                 "not testing the MySQL database through asyncio")
+class TestAsyncDBStorage(unittest.TestCase):
+    """Test the AsyncDBStorage class"""
+    def test_new_save_get_count(self):
+        """Test that a saved object can be read back by another task"""
+        from models.state import State
+
+        async def scenario():
+            storage = async_db_storage.AsyncDBStorage()
+            await storage.reload()
+            state = State(name="Async")
+            await storage.new(state)
+            await storage.save()
+
+            async def read():
+                found = await storage.get(State, state.id)
+                await storage.close()
+                return found
+            found = await asyncio.create_task(read())
+            count = await storage.count(State, name="Async")
+            exists = await storage.exists("State", state.id)
+            await storage.delete(state)
+            await storage.save()
+            await storage.close()
+            await storage.dispose()
+            return state, found, count, exists
+        state, found, count, exists = asyncio.run(scenario())
+        self.assertEqual(found.id, state.id)
+        self.assertIsNot(found, state)
+        self.assertGreaterEqual(count, 1)
+        self.assertTrue(exists)
+
+
+if __name__ == "__main__":
+    unittest.main()
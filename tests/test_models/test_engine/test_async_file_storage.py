@@ -0,0 +1,107 @@
+#!/usr/bin/python3
+"""
+Contains the TestAsyncFileStorageDocs and TestAsyncFileStorage classes
+"""
+
+import asyncio
+import inspect
+import models
+from models.engine import async_file_storage
+from models.engine.file_storage import FileStorage
+from models.state import State
+import pep8
+import unittest
+AsyncFileStorage = async_file_storage.AsyncFileStorage
+
+
+class TestAsyncFileStorageDocs(unittest.TestCase):
+    """Tests to check the documentation and style of AsyncFileStorage"""
+    @classmethod
+    def setUpClass(cls):
+        """Set up for the doc tests"""
+        cls.afs_f = [func for func in inspect.getmembers(
+            AsyncFileStorage, inspect.isfunction)]
+
+    def test_pep8_conformance_async_file_storage(self):
+        """Test that models/engine/async_file_storage.py conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['models/engine/async_file_storage.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_pep8_conformance_test_async_file_storage(self):
+        """Test tests/test_models/test_engine/test_async_file_storage.py"""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['tests/test_models/test_engine/\
+test_async_file_storage.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_async_file_storage_module_docstring(self):
+        """Test for the async_file_storage.py module docstring"""
+        self.assertIsNot(async_file_storage.__doc__, None,
+                         "async_file_storage.py needs a docstring")
+
+    def test_async_file_storage_class_docstring(self):
+        """Test for the AsyncFileStorage class docstring"""
+        self.assertIsNot(AsyncFileStorage.__doc__, None,
+                         "AsyncFileStorage class needs a docstring")
+
+    def test_async_file_storage_func_docstrings(self):
+        """Test for the presence of docstrings in AsyncFileStorage methods"""
+        for func in self.afs_f:
+            self.assertIsNot(func[1].__doc__, None,
+                             "{:s} method needs a docstring".format(func[0]))
+
+
+@unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+class TestAsyncFileStorage(unittest.TestCase):
+    """Test the AsyncFileStorage class"""
+    def setUp(self):
+        """creates the storage wrapped by the tests"""
+        self.storage = AsyncFileStorage(FileStorage())
+
+    def test_methods_are_coroutines(self):
+        """Test that the methods of the storage must be awaited"""
+        for name in ["all", "new", "save", "flush", "delete", "reload",
+                     "close", "get", "exists", "count"]:
+            self.assertTrue(inspect.iscoroutinefunction(
+                getattr(AsyncFileStorage, name)), name)
+
+    def test_new_save_get(self):
+        """Test that objects added through the storage can be found"""
+        async def scenario():
+            state = State(name="Async")
+            await self.storage.new(state)
+            handle = await self.storage.save()
+            await asyncio.to_thread(handle.wait)
+            found = await self.storage.get(State, state.id)
+            exists = await self.storage.exists(State, state.id)
+            count = await self.storage.count(State, name="Async")
+            objs = await self.storage.all(State)
+            await self.storage.delete(state)
+            gone = await self.storage.get(State, state.id)
+            return state, found, exists, count, objs, gone
+        state, found, exists, count, objs, gone = asyncio.run(scenario())
+        self.assertIs(found, state)
+        self.assertTrue(exists)
+        self.assertGreaterEqual(count, 1)
+        self.assertIn("State." + state.id, objs)
+        self.assertIsNone(gone)
+
+    def test_concurrent_calls(self):
+        """Test that calls made by many tasks at once all complete"""
+        states = [State(name="Task") for _ in range(10)]
+
+        async def scenario():
+            await asyncio.gather(*[self.storage.new(state)
+                                   for state in states])
+            return await asyncio.gather(*[self.storage.get(State, state.id)
+                                          for state in states])
+        self.assertEqual(asyncio.run(scenario()), states)
+        for state in states:
+            models.storage.delete(state)
+
+
+if __name__ == "__main__":
+    unittest.main()
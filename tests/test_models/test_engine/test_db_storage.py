@@ -17,7 +17,9 @@ from models.user import User
 import json
 import os
 import pep8
+import sqlalchemy
 import unittest
+from unittest import mock
 DBStorage = db_storage.DBStorage
 classes = {"Amenity": Amenity, "City": City, "Place": Place,
            "Review": Review, "State": State, "User": User}
@@ -68,6 +70,32 @@ test_db_storage.py'])
                             "{:s} method needs a docstring".format(func[0]))
 
 
+class TestDBStorageOptions(unittest.TestCase):
+    """Test the settings DBStorage takes from the environment"""
+    def options(self, environ):
+        """Returns the engine options for the variables in environ"""
+        with mock.patch.dict(os.environ, environ):
+            return DBStorage._engine_options(DBStorage.__new__(DBStorage))
+
+    def test_defaults(self):
+        """Test that the pool keeps the defaults of SQLAlchemy"""
+        self.assertEqual(self.options({}),
+                         {"poolclass": db_storage.TimedQueuePool})
+
+    def test_pool_settings(self):
+        """Test that the pool settings are read and converted"""
+        options = self.options({"HBNB_MYSQL_POOL_SIZE": "20",
+                                "HBNB_MYSQL_MAX_OVERFLOW": "5",
+                                "HBNB_MYSQL_POOL_TIMEOUT": "2.5",
+                                "HBNB_MYSQL_POOL_RECYCLE": "3600",
+                                "HBNB_MYSQL_POOL_PRE_PING": "1"})
+        self.assertEqual(options["pool_size"], 20)
+        self.assertEqual(options["max_overflow"], 5)
+        self.assertEqual(options["pool_timeout"], 2.5)
+        self.assertEqual(options["pool_recycle"], 3600)
+        self.assertIs(options["pool_pre_ping"], True)
+
+
 class TestFileStorage(unittest.TestCase):
     """Test the FileStorage class"""
     @unittest.skipIf(models.storage_t != 'db', "not testing db storage")
@@ -86,3 +114,306 @@ class TestFileStorage(unittest.TestCase):
     @unittest.skipIf(models.storage_t != 'db', "not testing db storage")
     def test_save(self):
         """Test that save properly saves objects to file.json"""
+
+    @unittest.skipIf(models.storage_t != 'db', "not testing db storage")
+    def test_get(self):
+        """Test that get returns the object with the given class and id"""
+        state = State(name="California")
+        state.save()
+        self.assertIs(models.storage.get(State, state.id), state)
+        self.assertIs(models.storage.get("State", state.id), state)
+        self.assertIsNone(models.storage.get(State, "missing"))
+        self.assertIsNone(models.storage.get(City, state.id))
+
+    @unittest.skipIf(models.storage_t != 'db', "not testing db storage")
+    def test_count(self):
+        """Test that count and counts agree with the rows of each table"""
+        before = models.storage.counts()
+        State(name="California").save()
+        counts = models.storage.counts()
+        self.assertEqual(set(counts), set(classes))
+        self.assertEqual(counts["State"], before["State"] + 1)
+        self.assertEqual(models.storage.count(State), counts["State"])
+        self.assertEqual(models.storage.count("State"), counts["State"])
+        self.assertEqual(models.storage.count(), sum(counts.values()))
+        self.assertEqual(models.storage.count("Nope"), 0)
+
+    @unittest.skipIf(models.storage_t != 'db', "not testing db storage")
+    def test_criteria(self):
+        """Test that all and count filter on the columns given"""
+        state = State(name="California")
+        state.save()
+        city = City(name="Fresno", state_id=state.id)
+        city.save()
+        self.assertEqual(models.storage.all(City, state_id=state.id),
+                         {"City." + city.id: city})
+        self.assertEqual(models.storage.count(City, state_id=state.id), 1)
+        self.assertEqual(models.storage.count(City, state_id="missing"), 0)
+        self.assertEqual(models.storage.all(State, nosuch="column"), {})
+        self.assertEqual(models.storage.count(State, nosuch="column"), 0)
+        self.assertIn("City." + city.id,
+                      models.storage.all(state_id=state.id))
+
+    @unittest.skipIf(models.storage_t != 'db', "not testing db storage")
+    def test_exists(self):
+        """Test that exists finds rows by class and id"""
+        state = State(name="California")
+        state.save()
+        self.assertTrue(models.storage.exists(State, state.id))
+        self.assertTrue(models.storage.exists("State", state.id))
+        self.assertFalse(models.storage.exists(City, state.id))
+        self.assertFalse(models.storage.exists(State, "missing"))
+
+    @unittest.skipIf(models.storage_t != 'db', "not testing db storage")
+    def test_iter(self):
+        """Test that iter yields every matching row, detached"""
+        state = State(name="California")
+        state.save()
+        cities = [City(name=str(i), state_id=state.id) for i in range(5)]
+        for city in cities:
+            city.save()
+        ids = [city.id for city in models.storage.iter(
+            City, batch_size=2, state_id=state.id)]
+        self.assertEqual(sorted(ids), sorted(city.id for city in cities))
+        self.assertEqual(len(list(models.storage.iter(State))),
+                         models.storage.count(State))
+        self.assertEqual(list(models.storage.iter(State, nosuch=1)), [])
+
+    @unittest.skipIf(models.storage_t != 'db', "not testing db storage")
+    def test_pool_stats(self):
+        """Test that pool_stats describes the connection pool"""
+        models.storage.count(State)
+        stats = models.storage.pool_stats()
+        self.assertIs(type(stats), dict)
+        if "checkouts" in stats:
+            self.assertGreaterEqual(stats["checkouts"], 1)
+            self.assertGreaterEqual(stats["checked_out"], 0)
+
+    @unittest.skipIf(models.storage_t != 'db', "not testing db storage")
+    def test_all_load(self):
+        """Test that load fetches relationships in a constant number of
+        queries"""
+        for i in range(5):
+            state = State(name=str(i))
+            state.save()
+            for j in range(2):
+                City(name=str(j), state_id=state.id).save()
+        models.storage.close()
+        statements = []
+
+        def count(*args):
+            """Counts the statements sent to the database"""
+            statements.append(args[2])
+
+        engine = models.storage._DBStorage__engine
+        sqlalchemy.event.listen(engine, "before_cursor_execute", count)
+        try:
+            states = models.storage.all(State, load=["cities.places"])
+            cities = [city for state in states.values()
+                      for city in state.cities]
+            places = [place for city in cities for place in city.places]
+        finally:
+            sqlalchemy.event.remove(engine, "before_cursor_execute", count)
+        self.assertGreaterEqual(len(cities), 10)
+        self.assertEqual(len(statements), 3)
+
+    @unittest.skipIf(models.storage_t != 'db', "not testing db storage")
+    def test_migrate(self):
+        """Test that migrate adds a missing index and keeps the rows"""
+        State(name="California").save()
+        before = models.storage.count(State)
+        models.storage.close()
+        engine = models.storage._DBStorage__engine
+        index = [index for index in State.__table__.indexes
+                 if index.name == "ix_states_name"][0]
+        index.drop(engine)
+        self.assertEqual(models.storage.migrate(), ["ix_states_name"])
+        self.assertEqual(models.storage.migrate(), [])
+        self.assertEqual(models.storage.count(State), before)
+        names = [index["name"] for index in
+                 sqlalchemy.inspect(engine).get_indexes("states")]
+        self.assertIn("ix_states_name", names)
+
+    @unittest.skipIf(models.storage_t != 'db', "not testing db storage")
+    def test_indexes(self):
+        """Test that the foreign keys and sort columns are indexed"""
+        inspector = sqlalchemy.inspect(models.storage._DBStorage__engine)
+        expected = {"cities": ["state_id", "name", "updated_at"],
+                    "places": ["city_id", "user_id", "name", "updated_at"],
+                    "reviews": ["place_id", "user_id", "updated_at"],
+                    "states": ["name", "updated_at"],
+                    "amenities": ["name", "updated_at"],
+                    "users": []}
+        for table, columns in expected.items():
+            indexed = [index["column_names"][0]
+                       for index in inspector.get_indexes(table)]
+            for column in columns + ["created_at"]:
+                self.assertIn(column, indexed)
+
+    @unittest.skipIf(models.storage_t != 'db', "not testing db storage")
+    def test_bulk(self):
+        """Test that bulk_new and bulk_update reach the database"""
+        before = models.storage.count(State)
+        states = [State(name=str(i)) for i in range(10)]
+        models.storage.bulk_new(states)
+        self.assertEqual(models.storage.count(State), before + 10)
+        models.storage.bulk_update(State, [
+            {"id": states[0].id, "name": "Nevada"},
+            {"id": states[1].id, "name": "Utah", "nosuch": 1},
+            {"id": "missing", "name": "Nowhere"}])
+        self.assertEqual(states[0].name, "Nevada")
+        self.assertEqual(models.storage.count(State, name="Utah"), 1)
+        self.assertEqual(models.storage.count(State, name="Nowhere"), 0)
+
+    @unittest.skipIf(models.storage_t != 'db', "not testing db storage")
+    def test_bulk_update_to_dict(self):
+        """Test that bulk_update parses the dates written by to_dict()"""
+        state = State(name="California")
+        models.storage.bulk_new([state])
+        change = state.to_dict()
+        change["name"] = "Parsed"
+        models.storage.bulk_update(State, [change])
+        self.assertEqual(models.storage.count(State, name="Parsed"), 1)
+        with self.assertRaises(ValueError):
+            models.storage.bulk_update(State, [{"id": state.id,
+                                                "name": "Rejected",
+                                                "updated_at": "yesterday"}])
+        self.assertEqual(models.storage.count(State, name="Rejected"), 0)
+        State(name="Oregon").save()
+
+    @unittest.skipIf(models.storage_t != 'db', "not testing db storage")
+    def test_page(self):
+        """Test that pages follow created_at, then id"""
+        states = [State(name="Page") for i in range(5)]
+        for state in states[1:]:
+            state.created_at = states[0].created_at
+        models.storage.bulk_new(states)
+        ids = [state.id for state in sorted(
+            states, key=lambda state: (state.created_at, state.id))]
+        found = []
+        after = None
+        while True:
+            objs, after = models.storage.page(State, 2, after, name="Page")
+            found.extend([obj.id for obj in objs])
+            self.assertLessEqual(len(objs), 2)
+            if after is None:
+                break
+        self.assertEqual(found, ids)
+        self.assertEqual(models.storage.page(State, 2, nosuch=1), ([], None))
+        with self.assertRaises(ValueError):
+            models.storage.page(State, 0)
+
+    @unittest.skipIf(models.storage_t != 'db', "not testing db storage")
+    def test_generation(self):
+        """Test that adding, updating and deleting change the version"""
+        state = State(name="Version")
+        versions = [models.storage.generation(State)]
+        state.save()
+        versions.append(models.storage.generation(State))
+        state.name = "Version 2"
+        state.save()
+        versions.append(models.storage.generation("State"))
+        models.storage.delete(state)
+        models.storage.save()
+        versions.append(models.storage.generation(State))
+        state = State(name="Version")
+        state.save()
+        versions.append(models.storage.generation(State))
+        models.storage.bulk_update(State, [{"id": state.id, "name": "3"}])
+        versions.append(models.storage.generation(State))
+        for before, after in zip(versions, versions[1:]):
+            self.assertNotEqual(before, after)
+        self.assertEqual(len(set(versions)), len(versions))
+        self.assertEqual(models.storage.generation(State), versions[-1])
+
+    @unittest.skipIf(models.storage_t != 'db', "not testing db storage")
+    def test_generation_scope(self):
+        """Test that the version only moves with committed changes of
+        the class"""
+        state = State(name="Scope")
+        state.save()
+        version = models.storage.generation(State)
+        City(name="City", state_id=state.id).save()
+        models.storage.save()
+        self.assertEqual(models.storage.generation(State), version)
+        with self.assertRaises(ValueError):
+            with models.storage.transaction():
+                state.name = "Rolled back"
+                state.save()
+                raise ValueError
+        self.assertEqual(models.storage.generation(State), version)
+
+    @unittest.skipIf(models.storage_t != 'db', "not testing db storage")
+    def test_subscribe(self):
+        """Test that listeners are told of the changes once committed"""
+        changes = []
+
+        def listener(name, parents):
+            """Records a change"""
+            changes.append((name, parents))
+        models.storage.subscribe(listener)
+        try:
+            state = State(name="Listened")
+            city = City(name="City", state_id=state.id)
+            with models.storage.transaction():
+                state.save()
+                city.save()
+                self.assertEqual(changes, [])
+            self.assertIn(("City", {("id", city.id),
+                                    ("state_id", state.id)}), changes)
+            del changes[:]
+            with self.assertRaises(ValueError):
+                with models.storage.transaction():
+                    State(name="Rolled back").save()
+                    raise ValueError("boom")
+            self.assertEqual(changes, [])
+            models.storage.bulk_update(City, [{"id": city.id}])
+            self.assertEqual(changes, [("City", None)])
+        finally:
+            models.storage.unsubscribe(listener)
+
+    @unittest.skipIf(models.storage_t != 'db', "not testing db storage")
+    def test_places_search(self):
+        """Test that places_search combines states, cities and amenities"""
+        user = User(email="search@hbnb.io", password="pwd")
+        wifi = Amenity(name="Wifi")
+        pool = Amenity(name="Pool")
+        states = [State(name="Search {}".format(i)) for i in range(2)]
+        cities = [City(name="City", state_id=state.id) for state in states]
+        places = [Place(name="Place", city_id=city.id, user_id=user.id)
+                  for city in cities]
+        places[0].amenities.extend([wifi, pool])
+        places[1].amenities.append(wifi)
+        models.storage.bulk_new([user, wifi, pool] + states + cities +
+                                places)
+
+        def search(**lists):
+            """Returns the set of ids of the places found"""
+            return {place.id
+                    for place in models.storage.places_search(**lists)}
+        ids = {place.id for place in places}
+        self.assertTrue(ids <= search())
+        self.assertEqual(search(states=[states[0].id]), {places[0].id})
+        self.assertEqual(search(states=[states[0].id],
+                                cities=[cities[1].id]), ids)
+        self.assertEqual(search(cities=[city.id for city in cities],
+                                amenities=[wifi.id]), ids)
+        self.assertEqual(search(amenities=[wifi.id, pool.id]),
+                         {places[0].id})
+
+    @unittest.skipIf(models.storage_t != 'db', "not testing db storage")
+    def test_transaction(self):
+        """Test that a transaction commits once or rolls back"""
+        before = models.storage.count(State)
+        with models.storage.transaction():
+            State(name="California").save()
+            State(name="Nevada").save()
+        self.assertEqual(models.storage.count(State), before + 2)
+        with self.assertRaises(ValueError):
+            with models.storage.transaction():
+                State(name="Oregon").save()
+                with models.storage.transaction():
+                    State(name="Rolled back").save()
+                raise ValueError("boom")
+        self.assertEqual(models.storage.count(State), before + 2)
+        self.assertEqual(models.storage.count(State, name="Rolled back"), 0)
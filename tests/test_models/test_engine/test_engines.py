@@ -0,0 +1,71 @@
+#!/usr/bin/python3
+"""
+Contains the TestEnginesDocs and TestEngines classes
+"""
+
+import models
+from models import engine
+from models.engine.file_storage import FileStorage
+import pep8
+import unittest
+
+
+class TestEnginesDocs(unittest.TestCase):
+    """Tests to check the documentation and style of the registry"""
+    def test_pep8_conformance_engines(self):
+        """Test that models/engine/__init__.py conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['models/engine/__init__.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_pep8_conformance_test_engines(self):
+        """Test tests/test_models/test_engine/test_engines.py conforms"""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['tests/test_models/test_engine/\
+test_engines.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_engines_module_docstring(self):
+        """Test for the models/engine/__init__.py module docstring"""
+        self.assertIsNot(engine.__doc__, None,
+                         "models/engine/__init__.py needs a docstring")
+
+    def test_engines_func_docstrings(self):
+        """Test for the presence of docstrings in the functions"""
+        for func in (engine.register, engine.kind, engine.load):
+            self.assertIsNot(func.__doc__, None,
+                             "{:s} needs a docstring".format(func.__name__))
+
+
+class TestEngines(unittest.TestCase):
+    """Test the registry of the storage engines"""
+    def tearDown(self):
+        """Forget the engines registered by the tests"""
+        engine.engines.pop("test", None)
+
+    def test_kind(self):
+        """Test the kind of the shipped engines"""
+        self.assertEqual(engine.kind("file"), "file")
+        self.assertEqual(engine.kind("db"), "db")
+        self.assertEqual(engine.kind("sqlite"), "db")
+
+    def test_default(self):
+        """Test that unknown or missing names pick the file storage"""
+        self.assertEqual(engine.kind(None), "file")
+        self.assertEqual(engine.kind("nope"), "file")
+        self.assertIs(engine.load(None), FileStorage)
+
+    def test_register(self):
+        """Test that a registered engine can be loaded by name"""
+        engine.register("test", "models.engine.file_storage", "FileStorage",
+                        "file")
+        self.assertEqual(engine.kind("test"), "file")
+        self.assertIs(engine.load("test"), FileStorage)
+
+    def test_storage(self):
+        """Test that models.storage comes from the selected engine"""
+        self.assertIsInstance(models.storage,
+                              engine.load(models.storage_name))
+        self.assertEqual(models.storage_t, engine.kind(models.storage_name))
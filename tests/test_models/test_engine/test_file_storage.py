@@ -6,7 +6,7 @@ from models import storage
 from datetime import datetime
 import inspect
 import models
-from models.engine import file_storage
+from models.engine import file_storage, journal
 from models.amenity import Amenity
 from models.base_model import BaseModel
 from models.city import City
@@ -15,10 +15,18 @@ from models.review import Review
 from models.state import State
 from models.user import User
 import json
+import multiprocessing
 import os
+from os import path, remove
 import pep8
+import tempfile
+import threading
+import time
 import unittest
+from unittest import mock
 FileStorage = file_storage.FileStorage
+STORAGE_TYPE = models.storage_t
+F = "file.json"
 classes = {"Amenity": Amenity, "BaseModel": BaseModel, "City": City,
            "Place": Place, "Review": Review, "State": State, "User": User}
 
@@ -114,6 +122,1191 @@ class TestFileStorage(unittest.TestCase):
             js = f.read()
         self.assertEqual(json.loads(string), json.loads(js))
 
+
+@unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+class TestFileStorageIndexes(unittest.TestCase):
+    """Test the indexes FileStorage keeps alongside __objects"""
+    def setUp(self):
+        """Start every test from an empty storage"""
+        self.storage = FileStorage()
+        self.saved = dict(self.storage.all())
+        self.storage.delete_all()
+
+    def tearDown(self):
+        """Put back the objects that were in storage before the test"""
+        self.storage.delete_all()
+        for obj in self.saved.values():
+            self.storage.new(obj)
+
+    def test_all_cls(self):
+        """Test that all(cls) only returns objects of that class"""
+        state = State()
+        city = City()
+        self.storage.new(state)
+        self.storage.new(city)
+        key = "State." + state.id
+        self.assertEqual(self.storage.all(State), {key: state})
+        self.assertEqual(self.storage.all("State"), {key: state})
+        self.assertEqual(self.storage.all(Amenity), {})
+
+    def test_all_cls_is_a_copy(self):
+        """Test that changing the dict from all(cls) leaves storage alone"""
+        state = State()
+        self.storage.new(state)
+        self.storage.all(State).clear()
+        self.assertEqual(self.storage.count(State), 1)
+
+    def test_delete_updates_index(self):
+        """Test that a deleted object disappears from all(cls) and count"""
+        state = State()
+        self.storage.new(state)
+        self.storage.delete(state)
+        self.assertEqual(self.storage.all(State), {})
+        self.assertEqual(self.storage.count(State), 0)
+        self.assertEqual(self.storage.count(), 0)
+
+    def test_get(self):
+        """Test that get finds an object by class and id"""
+        state = State()
+        self.storage.new(state)
+        self.assertIs(self.storage.get(State, state.id), state)
+        self.assertIs(self.storage.get("State", state.id), state)
+        self.assertIsNone(self.storage.get(City, state.id))
+        self.assertIsNone(self.storage.get(State, "missing"))
+
+    def test_all_criteria(self):
+        """Test that all(cls, **criteria) filters on attribute values"""
+        state = State()
+        city = City(state_id=state.id, name="Fremont")
+        other = City(state_id="other", name="Fremont")
+        self.storage.new(city)
+        self.storage.new(other)
+        self.assertEqual(self.storage.all(City, state_id=state.id),
+                         {"City." + city.id: city})
+        self.assertEqual(len(self.storage.all(City, name="Fremont")), 2)
+        self.assertEqual(self.storage.all(City, state_id=state.id,
+                                          name="Napa"), {})
+        self.assertEqual(self.storage.all(City, state_id="missing"), {})
+
+    def test_relationships(self):
+        """Test the relationship getters backed by the parent id indexes"""
+        state = State()
+        city = City(state_id=state.id)
+        user = User()
+        place = Place(city_id=city.id, user_id=user.id)
+        review = Review(place_id=place.id, user_id=user.id)
+        for obj in (state, city, user, place, review):
+            self.storage.new(obj)
+        self.assertEqual(state.cities, [city])
+        self.assertEqual(city.places, [place])
+        self.assertEqual(place.reviews, [review])
+        self.assertEqual(user.places, [place])
+        self.assertEqual(user.reviews, [review])
+
+    def test_update_moves_child(self):
+        """Test that new() refiles an object whose parent id changed"""
+        first = State()
+        second = State()
+        city = City(state_id=first.id)
+        self.storage.new(city)
+        city.state_id = second.id
+        self.storage.new(city)
+        self.assertEqual(first.cities, [])
+        self.assertEqual(second.cities, [city])
+
+    def test_delete_removes_child(self):
+        """Test that a deleted object leaves its parent's list"""
+        state = State()
+        city = City(state_id=state.id)
+        self.storage.new(city)
+        self.storage.delete(city)
+        self.assertEqual(state.cities, [])
+
+    def test_count(self):
+        """Test that count works per class and overall"""
+        for i in range(3):
+            self.storage.new(State())
+        self.storage.new(User())
+        self.assertEqual(self.storage.count(State), 3)
+        self.assertEqual(self.storage.count("User"), 1)
+        self.assertEqual(self.storage.count(Review), 0)
+        self.assertEqual(self.storage.count(), 4)
+
+    def test_all_criteria_without_cls(self):
+        """Test that all filters every class when only criteria are given"""
+        state = State()
+        city = City(state_id=state.id)
+        place = Place(name="Home")
+        for obj in (state, city, place):
+            self.storage.new(obj)
+        self.assertEqual(self.storage.all(state_id=state.id),
+                         {"City." + city.id: city})
+        self.assertEqual(list(self.storage.all(name="Home").values()),
+                         [place])
+        self.assertEqual(self.storage.all(name="Nowhere"), {})
+
+    def test_exists(self):
+        """Test that exists finds objects by class and id"""
+        state = State()
+        self.storage.new(state)
+        self.assertTrue(self.storage.exists(State, state.id))
+        self.assertTrue(self.storage.exists("State", state.id))
+        self.assertFalse(self.storage.exists(City, state.id))
+        self.assertFalse(self.storage.exists(State, "missing"))
+        self.storage.delete(state)
+        self.assertFalse(self.storage.exists(State, state.id))
+
+    def test_count_criteria(self):
+        """Test that count only counts the objects matching criteria"""
+        state = State()
+        self.storage.new(state)
+        for name in ("San Francisco", "San Jose", "Fresno"):
+            self.storage.new(City(state_id=state.id, name=name))
+        self.storage.new(City(state_id="other", name="Fresno"))
+        self.assertEqual(self.storage.count(City, state_id=state.id), 3)
+        self.assertEqual(self.storage.count(City, state_id="missing"), 0)
+        self.assertEqual(self.storage.count(City, name="Fresno"), 2)
+        self.assertEqual(self.storage.count(City, state_id=state.id,
+                                            name="Fresno"), 1)
+        self.assertEqual(self.storage.count(name="Fresno"), 2)
+
+    def test_iter(self):
+        """Test that iter yields the objects of a class batch by batch"""
+        states = [State() for i in range(5)]
+        for state in states:
+            self.storage.new(state)
+        self.storage.new(City(state_id=states[0].id))
+        self.assertEqual(list(self.storage.iter(State, batch_size=2)),
+                         states)
+        self.assertEqual(len(list(self.storage.iter())), 6)
+        self.assertEqual(len(list(self.storage.iter(
+            City, state_id=states[0].id))), 1)
+        self.assertEqual(list(self.storage.iter(
+            City, state_id=states[1].id)), [])
+
+    def test_iter_while_deleting(self):
+        """Test that objects deleted while iterating are skipped"""
+        states = [State() for i in range(4)]
+        for state in states:
+            self.storage.new(state)
+        seen = []
+        for state in self.storage.iter(State, batch_size=1):
+            seen.append(state)
+            self.storage.delete(states[-1])
+        self.assertEqual(seen, states[:-1])
+
+    def test_migrate(self):
+        """Test that migrate has nothing to do"""
+        self.assertEqual(self.storage.migrate(), [])
+
+    def test_counts(self):
+        """Test that counts gives the count of every class at once"""
+        for i in range(3):
+            self.storage.new(State())
+        self.storage.new(User())
+        counts = self.storage.counts()
+        self.assertEqual(set(counts), set(file_storage.classes))
+        self.assertEqual(counts["State"], 3)
+        self.assertEqual(counts["User"], 1)
+        self.assertEqual(counts["Review"], 0)
+
+
+class FileStorageTestCase(unittest.TestCase):
+    """Base for the tests running an empty storage on a temporary file"""
+    def setUp(self):
+        """Point an empty storage at a temporary file"""
+        self.storage = FileStorage()
+        self.saved = dict(self.storage.all())
+        self.storage.delete_all()
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "file.json")
+        self.log = self.path + ".log"
+        FileStorage._FileStorage__file_path = self.path
+
+    def tearDown(self):
+        """Restore the storage settings and objects"""
+        FileStorage._FileStorage__file_path = "file.json"
+        FileStorage._FileStorage__journal = False
+        FileStorage._FileStorage__journal_limit = 4 * 1024 ** 2
+        FileStorage._FileStorage__lazy = False
+        self.storage.delete_all()
+        for obj in self.saved.values():
+            self.storage.new(obj)
+        self.tmp.cleanup()
+
+    def reloaded(self):
+        """Empty the storage and read it back from disk"""
+        self.storage.delete_all()
+        self.storage.reload()
+        return self.storage.all()
+
+    def saved_json(self):
+        """Returns the content of the JSON file"""
+        with open(self.path) as f:
+            return json.load(f)
+
+
+@unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+class TestFileStorageSave(FileStorageTestCase):
+    """Test that save only serializes what changed"""
+    def test_save_only_serializes_changes(self):
+        """Test that clean objects are not serialized again"""
+        first = State(name="California")
+        second = State(name="Nevada")
+        self.storage.new(first)
+        self.storage.new(second)
+        self.storage.save()
+        second.name = "Oregon"
+        self.storage.new(second)
+        with mock.patch.object(State, "to_dict", autospec=True,
+                               side_effect=State.to_dict) as to_dict:
+            self.storage.save()
+        self.assertEqual(to_dict.call_count, 1)
+        self.assertEqual(self.saved_json(),
+                         {"State." + first.id: first.to_dict(),
+                          "State." + second.id: second.to_dict()})
+
+    def test_save_after_delete(self):
+        """Test that a deleted object leaves the JSON file"""
+        first = State()
+        second = State()
+        self.storage.new(first)
+        self.storage.new(second)
+        self.storage.save()
+        self.storage.delete(first)
+        self.storage.save()
+        self.assertEqual(self.saved_json(),
+                         {"State." + second.id: second.to_dict()})
+
+    def test_save_replaced_object(self):
+        """Test that an object replaced under the same key is serialized"""
+        state = State(name="California")
+        self.storage.new(state)
+        self.storage.save()
+        copy = State(**state.to_dict())
+        copy.name = "Nevada"
+        FileStorage._FileStorage__objects["State." + state.id] = copy
+        self.storage.save()
+        self.assertEqual(self.saved_json()["State." + state.id]["name"],
+                         "Nevada")
+
+    def test_save_after_setattr(self):
+        """Test that an attribute set without new() is saved"""
+        state = State(name="A")
+        self.storage.new(state)
+        self.storage.save()
+        state.name = "B"
+        self.storage.save()
+        self.assertEqual(self.saved_json()["State." + state.id]["name"], "B")
+        self.assertEqual(self.reloaded()["State." + state.id].name, "B")
+
+    def test_setattr_reindexes(self):
+        """Test that moving a city to another state by setting state_id
+        updates the index"""
+        city = City(state_id="first")
+        self.storage.new(city)
+        self.storage.save()
+        city.state_id = "second"
+        self.assertEqual(self.storage.all(City, state_id="first"), {})
+        self.assertEqual(self.storage.count(City, state_id="second"), 1)
+
+    def test_setattr_unstored(self):
+        """Test that setting attributes of an object the storage does not
+        hold leaves the storage alone"""
+        state = State(name="A")
+        state.name = "B"
+        self.assertEqual(self.storage.all(State), {})
+        copy = State(**state.to_dict())
+        self.storage.new(state)
+        self.storage.save()
+        copy.name = "C"
+        self.storage.save()
+        self.assertEqual(self.saved_json()["State." + state.id]["name"], "B")
+
+
+@unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+class TestFileStorageBulk(FileStorageTestCase):
+    """Test adding and updating many objects with a single write"""
+    def test_bulk_new(self):
+        """Test that bulk_new writes the file once"""
+        states = [State(name=str(i)) for i in range(50)]
+        with mock.patch.object(journal, "write_atomic",
+                               wraps=journal.write_atomic) as write:
+            self.storage.bulk_new(states)
+        self.assertEqual(write.call_count, 1)
+        self.assertEqual(len(self.saved_json()), 50)
+
+    def test_bulk_update(self):
+        """Test that bulk_update changes the objects and writes once"""
+        states = [State(name=str(i)) for i in range(3)]
+        self.storage.bulk_new(states)
+        old = states[0].updated_at
+        changes = [{"id": states[0].id, "name": "Nevada"},
+                   {"id": states[1].id, "name": "Utah"},
+                   {"id": "missing", "name": "Nowhere"}]
+        with mock.patch.object(journal, "write_atomic",
+                               wraps=journal.write_atomic) as write:
+            self.storage.bulk_update(State, changes)
+        self.assertEqual(write.call_count, 1)
+        self.assertEqual(states[0].name, "Nevada")
+        self.assertGreater(states[0].updated_at, old)
+        self.assertEqual(states[2].name, "2")
+        saved = self.saved_json()
+        self.assertEqual(saved["State." + states[1].id]["name"], "Utah")
+        self.assertEqual(len(saved), 3)
+
+    def test_bulk_update_to_dict(self):
+        """Test that the dates written by to_dict() are parsed"""
+        state = State(name="California")
+        self.storage.bulk_new([state])
+        change = state.to_dict()
+        change["name"] = "Nevada"
+        self.storage.bulk_update(State, [change])
+        self.assertEqual(state.name, "Nevada")
+        self.assertIsInstance(state.updated_at, datetime)
+        self.assertEqual(state.to_dict()["updated_at"],
+                         change["updated_at"])
+        other = State(name="Oregon")
+        other.save()
+        self.assertEqual(len(self.saved_json()), 2)
+
+    def test_bulk_update_bad_date(self):
+        """Test that a bad date changes no object"""
+        states = [State(name=str(i)) for i in range(2)]
+        self.storage.bulk_new(states)
+        with self.assertRaises(ValueError):
+            self.storage.bulk_update(State, [
+                {"id": states[0].id, "name": "Nevada"},
+                {"id": states[1].id, "updated_at": "yesterday"}])
+        self.assertEqual(states[0].name, "0")
+        self.assertIsInstance(states[1].updated_at, datetime)
+        self.storage.save()
+
+    def test_bulk_update_reindexes(self):
+        """Test that moving a city to another state updates the index"""
+        city = City(state_id="first")
+        self.storage.bulk_new([city])
+        self.storage.bulk_update("City", [{"id": city.id,
+                                           "state_id": "second"}])
+        self.assertEqual(self.storage.all(City, state_id="first"), {})
+        self.assertEqual(self.storage.count(City, state_id="second"), 1)
+
+
+@unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+class TestFileStoragePage(FileStorageTestCase):
+    """Test reading the objects of a class a page at a time"""
+    def pages(self, cls, limit, **criteria):
+        """Returns the ids of every page, read one after the other"""
+        pages = []
+        after = None
+        while True:
+            objs, after = self.storage.page(cls, limit, after, **criteria)
+            pages.append([obj.id for obj in objs])
+            if after is None:
+                return pages
+
+    def test_order(self):
+        """Test that pages follow created_at, then id"""
+        states = [State() for i in range(4)]
+        for state, day in zip(states, (3, 1, 2, 1)):
+            state.created_at = datetime(2020, 1, day)
+            self.storage.new(state)
+        ids = [state.id for state in sorted(
+            states, key=lambda state: (state.created_at, state.id))]
+        self.assertEqual(self.pages(State, 3), [ids[:3], ids[3:]])
+        self.assertEqual(self.pages(State, 4), [ids])
+        self.assertEqual(self.pages(City, 2), [[]])
+
+    def test_limit(self):
+        """Test that a limit below 1 is refused"""
+        self.storage.new(State())
+        for limit in (0, -1):
+            with self.assertRaises(ValueError):
+                self.storage.page(State, limit)
+
+    def test_criteria(self):
+        """Test that pages only hold the objects matching criteria"""
+        cities = [City(state_id="first" if i % 2 else "second")
+                  for i in range(5)]
+        self.storage.bulk_new(cities)
+        ids = [city.id for city in cities if city.state_id == "first"]
+        self.assertEqual(self.pages(City, 1, state_id="first"),
+                         [[ids[0]], [ids[1]]])
+        self.assertEqual(self.pages(City, 2, name="nosuch"), [[]])
+
+    def test_changes_between_pages(self):
+        """Test that objects deleted or added between pages do not shift
+        the following pages"""
+        states = [State() for i in range(4)]
+        self.storage.bulk_new(states)
+        objs, after = self.storage.page(State, 2)
+        self.storage.delete(objs[0])
+        self.storage.delete(states[2])
+        self.storage.new(State())
+        objs, after = self.storage.page(State, 2, after)
+        self.assertEqual(objs[0], states[3])
+        self.assertEqual(len(objs), 2)
+        self.assertIsNone(after)
+
+    def test_lazy(self):
+        """Test that a lazy reload keeps the order"""
+        states = [State() for i in range(3)]
+        self.storage.bulk_new(states)
+        FileStorage._FileStorage__lazy = True
+        self.reloaded()
+        self.assertEqual(self.pages(State, 2),
+                         [[s.id for s in states[:2]], [states[2].id]])
+
+
+@unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+class TestFileStorageGeneration(FileStorageTestCase):
+    """Test the versions of the classes handed out by generation()"""
+    def test_changes(self):
+        """Test that adding, updating and deleting change the version of
+        the class only"""
+        state = State()
+        versions = [self.storage.generation(State)]
+        cities = self.storage.generation(City)
+        self.storage.new(state)
+        versions.append(self.storage.generation(State))
+        state.name = "Nevada"
+        self.storage.new(state)
+        versions.append(self.storage.generation(State))
+        self.storage.delete(state)
+        versions.append(self.storage.generation(State))
+        self.storage.delete(state)
+        self.assertEqual(self.storage.generation(State), versions[-1])
+        self.assertEqual(len(set([v[0] for v in versions])), 4)
+        self.assertEqual(sorted(versions, key=lambda v: v[1]), versions)
+        self.assertEqual(self.storage.generation(City), cities)
+
+    def test_reads(self):
+        """Test that reading, saving and building lazy objects keep the
+        version"""
+        self.storage.bulk_new([State(), State()])
+        FileStorage._FileStorage__lazy = True
+        self.reloaded()
+        version = self.storage.generation("State")
+        self.storage.all(State)
+        self.storage.save()
+        self.storage.reload()
+        self.assertEqual(self.storage.generation("State"), version)
+
+    def test_changes_on_disk(self):
+        """Test that reload counts the changes made by another process"""
+        state = State()
+        self.storage.new(state)
+        self.storage.save()
+        version = self.storage.generation(State)
+        data = self.saved_json()
+        data["State." + state.id]["updated_at"] = "2030-01-01T00:00:00.000000"
+        with open(self.path, "w") as f:
+            json.dump(data, f)
+        self.storage.reload()
+        self.assertNotEqual(self.storage.generation(State), version)
+
+    def test_rollback(self):
+        """Test that a rolled back transaction changes the version"""
+        with self.assertRaises(ValueError):
+            with self.storage.transaction():
+                self.storage.new(State())
+                version = self.storage.generation(State)
+                raise ValueError("boom")
+        self.assertNotEqual(self.storage.generation(State), version)
+
+
+@unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+class TestFileStorageSubscribe(FileStorageTestCase):
+    """Test telling listeners of the changes"""
+    def setUp(self):
+        """Subscribes a listener recording the changes"""
+        super().setUp()
+        self.changes = []
+        self.storage.subscribe(self.listener)
+
+    def tearDown(self):
+        """Unsubscribes the listener"""
+        self.storage.unsubscribe(self.listener)
+        super().tearDown()
+
+    def listener(self, name, parents):
+        """Records a change"""
+        self.changes.append((name, parents))
+
+    def test_new_delete(self):
+        """Test that a change tells the old and new parents"""
+        city = City(state_id="first")
+        self.storage.new(city)
+        city.state_id = "second"
+        self.storage.new(city)
+        self.storage.delete(city)
+        self.storage.delete(city)
+        self.assertEqual(self.changes, [
+            ("City", {("id", city.id), ("state_id", "first")}),
+            ("City", {("id", city.id), ("state_id", "first"),
+                      ("state_id", "second")}),
+            ("City", {("id", city.id), ("state_id", "second")})])
+
+    def test_reads(self):
+        """Test that reads and saves tell nothing"""
+        self.storage.new(State())
+        self.storage.save()
+        del self.changes[:]
+        self.storage.all(State)
+        self.storage.reload()
+        self.assertEqual(self.changes, [])
+
+    def test_unsubscribe(self):
+        """Test that a listener unsubscribed is told nothing"""
+        self.storage.unsubscribe(self.listener)
+        self.storage.new(State())
+        self.assertEqual(self.changes, [])
+
+
+@unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+class TestFileStoragePlacesSearch(FileStorageTestCase):
+    """Test searching places through the indexes"""
+    def setUp(self):
+        """Creates two states with a city and a place each"""
+        super().setUp()
+        self.wifi = Amenity(name="Wifi")
+        self.pool = Amenity(name="Pool")
+        self.states = [State(name="California"), State(name="Nevada")]
+        self.cities = [City(state_id=state.id) for state in self.states]
+        self.places = [Place(city_id=city.id) for city in self.cities]
+        self.places[0].amenities = self.wifi
+        self.places[0].amenities = self.pool
+        self.places[1].amenities = self.wifi
+        self.storage.bulk_new([self.wifi, self.pool] + self.states +
+                              self.cities + self.places)
+
+    def search(self, **lists):
+        """Returns the set of ids of the places found"""
+        return {place.id for place in self.storage.places_search(**lists)}
+
+    def test_all_places(self):
+        """Test that empty lists return every place"""
+        self.assertEqual(self.search(), {p.id for p in self.places})
+
+    def test_states_and_cities(self):
+        """Test that states and cities add up"""
+        self.assertEqual(self.search(states=[self.states[0].id]),
+                         {self.places[0].id})
+        self.assertEqual(self.search(states=[self.states[0].id],
+                                     cities=[self.cities[1].id]),
+                         {p.id for p in self.places})
+        self.assertEqual(self.search(cities=["missing"]), set())
+
+    def test_amenities(self):
+        """Test that places must have every amenity"""
+        self.assertEqual(self.search(amenities=[self.wifi.id]),
+                         {p.id for p in self.places})
+        self.assertEqual(self.search(amenities=[self.wifi.id,
+                                                self.pool.id]),
+                         {self.places[0].id})
+        self.assertEqual(self.search(states=[self.states[1].id],
+                                     amenities=[self.pool.id]), set())
+
+    def test_amenities_reindexed(self):
+        """Test that amenities added to a saved place are found"""
+        self.places[1].amenities = self.pool
+        self.storage.new(self.places[1])
+        self.assertEqual(self.search(amenities=[self.pool.id]),
+                         {p.id for p in self.places})
+        self.places[1].amenity_ids = []
+        self.storage.new(self.places[1])
+        self.assertEqual(self.search(amenities=[self.wifi.id]),
+                         {self.places[0].id})
+
+    def test_lazy(self):
+        """Test that the places read by a lazy reload are found"""
+        self.storage.save()
+        FileStorage._FileStorage__lazy = True
+        self.reloaded()
+        found = self.storage.places_search(states=[self.states[0].id],
+                                           amenities=[self.pool.id])
+        self.assertEqual([place.id for place in found], [self.places[0].id])
+
+
+@unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+class TestFileStorageTransaction(FileStorageTestCase):
+    """Test grouping changes into transactions"""
+    def setUp(self):
+        """Save a state to change in the transactions"""
+        super().setUp()
+        self.state = State(name="California")
+        self.state.save()
+
+    def test_commit(self):
+        """Test that the saves of a transaction are written once"""
+        with mock.patch.object(journal, "write_atomic",
+                               wraps=journal.write_atomic) as write:
+            with self.storage.transaction():
+                city = City(state_id=self.state.id, name="Napa")
+                handle = city.save()
+                self.state.name = "Nevada"
+                self.state.save()
+                self.assertFalse(handle.done)
+                self.assertEqual(write.call_count, 0)
+        self.assertEqual(write.call_count, 1)
+        self.assertTrue(handle.wait(0))
+        saved = self.saved_json()
+        self.assertIn("City." + city.id, saved)
+        self.assertEqual(saved["State." + self.state.id]["name"], "Nevada")
+
+    def test_rollback(self):
+        """Test that a failing transaction undoes its changes"""
+        key = "State." + self.state.id
+        other = State(name="Oregon")
+        with self.assertRaises(ValueError):
+            with self.storage.transaction():
+                city = City(state_id=self.state.id, name="Napa")
+                handle = city.save()
+                self.state.name = "Nevada"
+                self.state.save()
+                self.storage.delete(self.state)
+                other.save()
+                raise ValueError("boom")
+        self.assertRaises(ValueError, handle.wait, 0)
+        self.assertEqual(self.storage.all(City), {})
+        self.assertEqual(self.storage.all(State, name="Oregon"), {})
+        self.assertEqual(self.storage.get(State, self.state.id).name,
+                         "California")
+        self.assertEqual(self.storage.count(City, state_id=self.state.id), 0)
+        self.assertEqual(list(self.saved_json()), [key])
+        self.storage.save()
+        self.assertEqual(list(self.saved_json()), [key])
+
+    def test_rollback_unsaved(self):
+        """Test that changes made before the transaction are kept"""
+        self.state.name = "Nevada"
+        self.storage.new(self.state)
+        with self.assertRaises(ValueError):
+            with self.storage.transaction():
+                self.state.name = "Utah"
+                self.state.save()
+                raise ValueError("boom")
+        state = self.storage.get(State, self.state.id)
+        self.assertEqual(state.name, "Nevada")
+        self.storage.save()
+        self.assertEqual(self.reloaded()["State." + state.id].name, "Nevada")
+
+    def test_rollback_journal(self):
+        """Test that a rollback reads the log back"""
+        FileStorage._FileStorage__journal = True
+        self.state.name = "Oregon"
+        self.state.save()
+        with self.assertRaises(ValueError):
+            with self.storage.transaction():
+                self.state.name = "Utah"
+                self.state.save()
+                raise ValueError("boom")
+        self.assertEqual(self.storage.get(State, self.state.id).name,
+                         "Oregon")
+
+    def test_nested(self):
+        """Test that only the outermost transaction writes"""
+        with mock.patch.object(journal, "write_atomic",
+                               wraps=journal.write_atomic) as write:
+            with self.storage.transaction():
+                with self.storage.transaction():
+                    City(state_id=self.state.id).save()
+                self.assertEqual(write.call_count, 0)
+                City(state_id=self.state.id).save()
+        self.assertEqual(write.call_count, 1)
+        self.assertEqual(self.storage.count(City), 2)
+
+    def test_isolation(self):
+        """Test that other threads wait for the transaction to end"""
+        seen = []
+        inside = threading.Event()
+
+        def count():
+            """Counts the cities once the transaction lets it"""
+            inside.wait(5)
+            seen.append(self.storage.count(City))
+
+        thread = threading.Thread(target=count)
+        thread.start()
+        with self.assertRaises(ValueError):
+            with self.storage.transaction():
+                City(state_id=self.state.id).save()
+                inside.set()
+                thread.join(0.1)
+                raise ValueError("boom")
+        thread.join()
+        self.assertEqual(seen, [0])
+
+
+@unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+class TestFileStorageJournal(FileStorageTestCase):
+    """Test FileStorage with its write-ahead log turned on"""
+    def setUp(self):
+        """Point an empty storage at a temporary file in journal mode"""
+        super().setUp()
+        FileStorage._FileStorage__journal = True
+
+    def test_save_appends_changes(self):
+        """Test that save only appends the changed objects to the log"""
+        first = State(name="California")
+        self.storage.new(first)
+        self.storage.save()
+        second = State(name="Nevada")
+        self.storage.new(second)
+        self.storage.save()
+        self.storage.save()
+        self.assertFalse(os.path.exists(self.path))
+        with open(self.log) as f:
+            lines = [json.loads(line) for line in f]
+        self.assertEqual(lines, [{"State." + first.id: first.to_dict()},
+                                 {"State." + second.id: second.to_dict()}])
+
+    def test_reload_replays_log(self):
+        """Test that reload applies updates and deletions from the log"""
+        kept = State(name="California")
+        gone = State(name="Nevada")
+        self.storage.new(kept)
+        self.storage.new(gone)
+        self.storage.save()
+        kept.name = "Oregon"
+        self.storage.new(kept)
+        self.storage.delete(gone)
+        self.storage.save()
+        objs = self.reloaded()
+        self.assertEqual(list(objs.keys()), ["State." + kept.id])
+        self.assertEqual(objs["State." + kept.id].name, "Oregon")
+
+    def test_reload_ignores_torn_write(self):
+        """Test that an incomplete last line of the log is dropped"""
+        state = State(name="California")
+        self.storage.new(state)
+        self.storage.save()
+        with open(self.log, "a") as f:
+            f.write('{"State.torn": {"id"')
+        self.assertEqual(list(self.reloaded().keys()), ["State." + state.id])
+        city = City(state_id=state.id)
+        self.storage.new(city)
+        self.storage.save()
+        self.assertEqual(len(self.reloaded()), 2)
+
+    def test_compaction(self):
+        """Test that a long log is folded back into the JSON file"""
+        FileStorage._FileStorage__journal_limit = 1
+        state = State(name="California")
+        self.storage.new(state)
+        self.storage.save()
+        FileStorage._FileStorage__compaction.join()
+        self.assertFalse(os.path.exists(self.log))
+        self.assertFalse(os.path.exists(self.log + ".old"))
+        self.assertEqual(self.saved_json(),
+                         {"State." + state.id: state.to_dict()})
+        self.assertEqual(list(self.reloaded().keys()), ["State." + state.id])
+
+    def test_compaction_removes_temps(self):
+        """Test that a compaction removes the snapshots left by processes
+        that exited during one"""
+        FileStorage._FileStorage__journal_limit = 1
+        stale = self.path + ".99999.tmp"
+        with open(stale, "w") as f:
+            f.write("{")
+        self.storage.new(State(name="California"))
+        self.storage.save()
+        FileStorage._FileStorage__compaction.join()
+        self.assertFalse(os.path.exists(stale))
+        self.assertEqual(os.listdir(self.tmp.name), ["file.json"])
+
+    def test_exit_waits_for_compaction(self):
+        """Test that the hook run at exit waits for the compaction"""
+        FileStorage._FileStorage__journal_limit = 1
+        write_temp = journal.write_temp
+
+        def slow_write_temp(path, text):
+            """Writes the snapshot after a while"""
+            time.sleep(0.2)
+            return write_temp(path, text)
+        with mock.patch.object(journal, "write_temp", slow_write_temp):
+            self.storage.new(State(name="California"))
+            self.storage.save()
+            self.storage._join_compaction()
+        self.assertFalse(FileStorage._FileStorage__compaction.is_alive())
+        self.assertEqual(os.listdir(self.tmp.name), ["file.json"])
+
+
+@unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+class TestFileStorageLazy(FileStorageTestCase):
+    """Test FileStorage building objects only when they are asked for"""
+    def setUp(self):
+        """Save a small graph of objects and reload it lazily"""
+        super().setUp()
+        self.state = State(name="California")
+        self.city = City(state_id=self.state.id, name="Napa")
+        self.other = City(state_id="other", name="Reno")
+        for obj in (self.state, self.city, self.other):
+            self.storage.new(obj)
+        self.storage.save()
+        with open(self.path) as f:
+            self.text = f.read()
+        FileStorage._FileStorage__lazy = True
+        self.storage.delete_all()
+        self.storage.reload()
+
+    def built(self):
+        """Returns the keys of the objects built so far"""
+        return set(FileStorage._FileStorage__objects.keys())
+
+    def test_reload_builds_nothing(self):
+        """Test that reload and count do not build any object"""
+        self.assertEqual(self.built(), set())
+        self.assertEqual(self.storage.count(), 3)
+        self.assertEqual(self.storage.count(City), 2)
+        self.assertEqual(self.storage.counts()["City"], 2)
+        self.assertEqual(self.built(), set())
+
+    def test_all_load(self):
+        """Test that load builds the related objects up front"""
+        self.storage.all(State, load=["cities", "nosuch"])
+        self.assertEqual(self.built(), {"State." + self.state.id,
+                                        "City." + self.city.id})
+
+    def test_get_builds_one(self):
+        """Test that get only builds the object asked for"""
+        state = self.storage.get(State, self.state.id)
+        self.assertEqual(state.to_dict(), self.state.to_dict())
+        self.assertIs(self.storage.get(State, self.state.id), state)
+        self.assertEqual(self.built(), {"State." + self.state.id})
+
+    def test_relationship_builds_children(self):
+        """Test that a relationship only builds the children it returns"""
+        state = self.storage.get(State, self.state.id)
+        self.assertEqual([city.id for city in state.cities], [self.city.id])
+        self.assertEqual(self.built(), {"State." + self.state.id,
+                                        "City." + self.city.id})
+
+    def test_all(self):
+        """Test that all builds the objects of the class, or every one"""
+        self.assertEqual(len(self.storage.all(City)), 2)
+        self.assertEqual(len(self.built()), 2)
+        self.assertEqual(len(self.storage.all()), 3)
+
+    def test_delete_unbuilt(self):
+        """Test that deleting an object that was never built works"""
+        self.storage.delete(self.other)
+        self.assertEqual(self.storage.count(City), 1)
+        self.storage.save()
+        self.assertNotIn("City." + self.other.id, self.saved_json())
+
+    def test_save_keeps_unbuilt(self):
+        """Test that save writes objects that were never built as is"""
+        self.storage.get(State, self.state.id)
+        self.storage.save()
+        with open(self.path) as f:
+            self.assertEqual(json.loads(f.read()), json.loads(self.text))
+
+
+@unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+class TestFileStorageReload(FileStorageTestCase):
+    """Test that reload only picks up what changed on disk"""
+    def setUp(self):
+        """Save two states"""
+        super().setUp()
+        self.kept = State(name="California")
+        self.changed = State(name="Nevada")
+        self.storage.new(self.kept)
+        self.storage.new(self.changed)
+        self.storage.save()
+
+    def test_unchanged_file_not_read(self):
+        """Test that reload does not read a file it last wrote"""
+        with mock.patch.object(file_storage.json, "load") as load:
+            self.storage.reload()
+            self.storage.close()
+        self.assertFalse(load.called)
+        self.assertIs(self.storage.get(State, self.kept.id), self.kept)
+
+    def test_changed_entries_only(self):
+        """Test that reload only rebuilds the objects changed on disk"""
+        data = self.saved_json()
+        data["State." + self.changed.id]["name"] = "Oregon"
+        data["State." + self.changed.id]["updated_at"] = \
+            "2100-01-01T00:00:00.000000"
+        city = City(state_id=self.kept.id)
+        data["City." + city.id] = city.to_dict()
+        with open(self.path, "w") as f:
+            json.dump(data, f)
+        self.storage.reload()
+        self.assertIs(self.storage.get(State, self.kept.id), self.kept)
+        self.assertEqual(self.storage.get(State, self.changed.id).name,
+                         "Oregon")
+        self.assertEqual(self.storage.get(City, city.id).to_dict(),
+                         city.to_dict())
+        self.assertEqual(self.kept.cities[0].id, city.id)
+
+    def test_deleted_on_disk(self):
+        """Test that an object removed from the file leaves storage"""
+        data = self.saved_json()
+        del data["State." + self.changed.id]
+        with open(self.path, "w") as f:
+            json.dump(data, f)
+        self.storage.reload()
+        self.assertIsNone(self.storage.get(State, self.changed.id))
+        self.assertEqual(self.storage.count(), 1)
+
+    def test_unsaved_changes_kept(self):
+        """Test that reload leaves objects changed since the last save"""
+        self.changed.name = "Oregon"
+        self.storage.new(self.changed)
+        data = self.saved_json()
+        data["State." + self.changed.id]["updated_at"] = \
+            "2100-01-01T00:00:00.000000"
+        with open(self.path, "w") as f:
+            json.dump(data, f)
+        self.storage.reload()
+        self.assertIs(self.storage.get(State, self.changed.id), self.changed)
+        self.assertEqual(self.changed.name, "Oregon")
+
+    def test_log_tail(self):
+        """Test that reload only replays what was appended to the log"""
+        FileStorage._FileStorage__journal = True
+        self.storage.delete_all()
+        self.storage.reload()
+        kept = self.storage.get(State, self.kept.id)
+        city = City(state_id=self.kept.id)
+        journal.append(self.log, json.dumps({"City." + city.id:
+                                             city.to_dict()}))
+        with mock.patch.object(file_storage.json, "load") as load:
+            self.storage.reload()
+        self.assertFalse(load.called)
+        self.assertIs(self.storage.get(State, self.kept.id), kept)
+        self.assertEqual(self.storage.count(City), 1)
+        journal.append(self.log, json.dumps({"City." + city.id: None}))
+        self.storage.reload()
+        self.assertEqual(self.storage.count(City), 0)
+
+
+@unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+class TestFileStorageThreads(FileStorageTestCase):
+    """Hammer FileStorage from many threads at once"""
+    def hammer(self):
+        """Runs writer and reader threads, checks nothing got lost"""
+        states = [State(name=str(i)) for i in range(10)]
+        for state in states:
+            self.storage.new(state)
+        self.storage.save()
+        errors = []
+
+        def writer():
+            """Adds cities, deleting one in three, saving now and then"""
+            for i in range(60):
+                city = City(state_id=states[i % 10].id)
+                self.storage.new(city)
+                if i % 3 == 0:
+                    self.storage.delete(city)
+                if i % 5 == 0:
+                    self.storage.save()
+            self.storage.save()
+
+        def reader():
+            """Reads through every entry point while the writers run"""
+            for i in range(100):
+                for city in self.storage.all(City).values():
+                    city.to_dict()
+                for city in states[i % 10].cities:
+                    city.to_dict()
+                self.storage.count(City)
+                self.storage.get(State, states[0].id)
+                self.storage.close()
+
+        def run(target):
+            """Records the exceptions raised by target"""
+            try:
+                target()
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=run, args=(target,))
+                   for target in [writer] * 4 + [reader] * 8]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+        self.assertEqual(self.storage.count(City), 4 * 40)
+        self.assertEqual(len(self.storage.all(City)), 4 * 40)
+        self.assertEqual(sum([len(state.cities) for state in states]),
+                         4 * 40)
+        self.assertEqual(len(self.reloaded()), 10 + 4 * 40)
+
+    def test_threads(self):
+        """Test concurrent use of FileStorage"""
+        self.hammer()
+
+    def test_threads_journal(self):
+        """Test concurrent use of FileStorage with the log compacting"""
+        FileStorage._FileStorage__journal = True
+        FileStorage._FileStorage__journal_limit = 2048
+        self.hammer()
+
+    def test_threads_lazy(self):
+        """Test concurrent use of FileStorage building objects lazily"""
+        FileStorage._FileStorage__lazy = True
+        self.hammer()
+
+
+@unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+class TestFileStorageShared(FileStorageTestCase):
+    """Test several processes sharing one JSON file"""
+    def setUp(self):
+        """Turn on shared mode"""
+        super().setUp()
+        FileStorage._FileStorage__shared = True
+
+    def tearDown(self):
+        """Turn off shared mode"""
+        FileStorage._FileStorage__shared = False
+        super().tearDown()
+
+    def workers(self, count, per_worker):
+        """Has count processes add per_worker states each, then checks
+        that every one of them made it to disk"""
+        def work(n):
+            """Adds states one save at a time"""
+            for i in range(per_worker):
+                self.storage.new(State(name="{}-{}".format(n, i)))
+                self.storage.save()
+                self.storage.close()
+
+        context = multiprocessing.get_context("fork")
+        processes = [context.Process(target=work, args=(n,))
+                     for n in range(count)]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+        self.assertEqual([process.exitcode for process in processes],
+                         [0] * count)
+        self.storage.reload()
+        self.assertEqual(self.storage.count(State), count * per_worker)
+        self.assertEqual(len(self.reloaded()), count * per_worker)
+
+    def test_workers(self):
+        """Test that processes do not overwrite each other's objects"""
+        self.workers(4, 25)
+
+    def test_workers_journal(self):
+        """Test processes sharing the log while it gets compacted"""
+        FileStorage._FileStorage__journal = True
+        FileStorage._FileStorage__journal_limit = 2048
+        self.workers(4, 25)
+
+    def test_sees_other_process(self):
+        """Test that close() picks up what another process wrote"""
+        state = State(name="California")
+        self.storage.new(state)
+        self.storage.save()
+
+        def rename():
+            """Renames the state and adds a city in another process"""
+            copy = self.storage.get(State, state.id)
+            copy.name = "Nevada"
+            copy.save()
+            City(state_id=state.id).save()
+
+        context = multiprocessing.get_context("fork")
+        process = context.Process(target=rename)
+        process.start()
+        process.join()
+        self.storage.close()
+        self.assertEqual(self.storage.get(State, state.id).name, "Nevada")
+        self.assertEqual(len(self.storage.get(State, state.id).cities), 1)
+
+
+@unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+class TestFileStorageGroupCommit(FileStorageTestCase):
+    """Test the saves written together in the background"""
+    def setUp(self):
+        """Turn on group commit with a long interval"""
+        super().setUp()
+        FileStorage._FileStorage__flush_interval = 60
+        FileStorage._FileStorage__flush_batch = 1000
+
+    def tearDown(self):
+        """Write what is left and turn off group commit"""
+        self.storage.flush()
+        FileStorage._FileStorage__flush_interval = 0
+        FileStorage._FileStorage__flush_batch = 100
+        FileStorage._FileStorage__flusher = None
+        super().tearDown()
+
+    def test_save_without_interval(self):
+        """Test that save writes right away without an interval"""
+        FileStorage._FileStorage__flush_interval = 0
+        state = State(name="California")
+        self.storage.new(state)
+        self.assertTrue(self.storage.save().done)
+        self.assertIn("State." + state.id, self.saved_json())
+
+    def test_save_waits(self):
+        """Test that save leaves the changes to the flusher"""
+        state = State(name="California")
+        handle = state.save()
+        self.assertFalse(handle.done)
+        self.assertFalse(path.exists(self.path))
+        self.storage.flush()
+        self.assertTrue(handle.wait(0))
+        self.assertIn("State." + state.id, self.saved_json())
+
+    def test_batch(self):
+        """Test that a full batch is written at once, in one go"""
+        FileStorage._FileStorage__flush_batch = 5
+        with mock.patch.object(journal, "write_atomic",
+                               wraps=journal.write_atomic) as write:
+            handles = [State(name=str(i)).save() for i in range(5)]
+            self.assertTrue(handles[-1].wait(5))
+        self.assertTrue(all(handle.done for handle in handles))
+        self.assertEqual(write.call_count, 1)
+        self.assertEqual(len(self.saved_json()), 5)
+
+    def test_interval(self):
+        """Test that the saves of one interval are written together"""
+        FileStorage._FileStorage__flush_interval = 0.05
+        with mock.patch.object(journal, "write_atomic",
+                               wraps=journal.write_atomic) as write:
+            handles = [State(name=str(i)).save() for i in range(20)]
+            self.assertTrue(handles[-1].wait(5))
+        self.assertLess(write.call_count, 20)
+        self.assertEqual(len(self.reloaded()), 20)
+
+    def test_journal(self):
+        """Test that a batch is appended to the log as one line"""
+        FileStorage._FileStorage__journal = True
+        FileStorage._FileStorage__flush_batch = 5
+        handles = [State(name=str(i)).save() for i in range(5)]
+        self.assertTrue(handles[-1].wait(5))
+        with open(self.log) as f:
+            self.assertEqual(len(f.readlines()), 1)
+        self.assertEqual(len(self.reloaded()), 5)
+
+    def test_threads(self):
+        """Test that saves from many threads all reach the disk"""
+        FileStorage._FileStorage__flush_interval = 0.01
+        handles = []
+
+        def work(n):
+            """Adds states one save at a time"""
+            for i in range(25):
+                handles.append(State(name="{}-{}".format(n, i)).save())
+
+        threads = [threading.Thread(target=work, args=(n,))
+                   for n in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        for handle in handles:
+            self.assertTrue(handle.wait(5))
+        self.assertEqual(len(self.reloaded()), 100)
+
+
 @unittest.skipIf(STORAGE_TYPE == 'db', 'skip if environ is db')
 class TestUserFsInstances(unittest.TestCase):
     """testing for class instances"""
@@ -125,6 +1318,7 @@ class TestUserFsInstances(unittest.TestCase):
         print('...... Testing FileStorage ......')
         print('.......... User  Class ..........')
         print('.................................\n\n')
+        storage.delete_all()
         cls.user = User()
         cls.user.save()
         cls.bm_obj = BaseModel()
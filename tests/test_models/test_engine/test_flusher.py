@@ -0,0 +1,156 @@
+#!/usr/bin/python3
+"""
+Contains the TestFlusherDocs, TestSaveHandle and TestFlusher classes
+"""
+
+import inspect
+from models.engine import flusher
+import pep8
+import threading
+import time
+import unittest
+Flusher = flusher.Flusher
+SaveHandle = flusher.SaveHandle
+
+
+class TestFlusherDocs(unittest.TestCase):
+    """Tests to check the documentation and style of flusher.py"""
+    @classmethod
+    def setUpClass(cls):
+        """Set up for the doc tests"""
+        cls.f_f = inspect.getmembers(Flusher, inspect.isfunction) + \
+            inspect.getmembers(SaveHandle, inspect.isfunction)
+
+    def test_pep8_conformance_flusher(self):
+        """Test that models/engine/flusher.py conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['models/engine/flusher.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_pep8_conformance_test_flusher(self):
+        """Test tests/test_models/test_engine/test_flusher.py conforms"""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['tests/test_models/test_engine/\
+test_flusher.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_flusher_module_docstring(self):
+        """Test for the flusher.py module docstring"""
+        self.assertIsNot(flusher.__doc__, None,
+                         "flusher.py needs a docstring")
+        self.assertTrue(len(flusher.__doc__) >= 1,
+                        "flusher.py needs a docstring")
+
+    def test_flusher_class_docstrings(self):
+        """Test for the Flusher and SaveHandle class docstrings"""
+        self.assertIsNot(Flusher.__doc__, None,
+                         "Flusher class needs a docstring")
+        self.assertIsNot(SaveHandle.__doc__, None,
+                         "SaveHandle class needs a docstring")
+
+    def test_flusher_func_docstrings(self):
+        """Test for the presence of docstrings in the methods"""
+        for func in self.f_f:
+            self.assertIsNot(func[1].__doc__, None,
+                             "{:s} method needs a docstring".format(func[0]))
+
+
+class TestSaveHandle(unittest.TestCase):
+    """Test the SaveHandle class"""
+    def test_pending(self):
+        """Test that a new handle waits until it is finished"""
+        handle = SaveHandle()
+        self.assertFalse(handle.done)
+        self.assertFalse(handle.wait(0.01))
+        handle.finish()
+        self.assertTrue(handle.done)
+        self.assertTrue(handle.wait(0.01))
+
+    def test_done(self):
+        """Test that a handle can start out finished"""
+        self.assertTrue(SaveHandle(done=True).wait(0))
+
+    def test_error(self):
+        """Test that wait raises the error of the write"""
+        handle = SaveHandle()
+        handle.finish(OSError("disk full"))
+        self.assertTrue(handle.done)
+        self.assertRaises(OSError, handle.wait)
+
+
+class TestFlusher(unittest.TestCase):
+    """Test the Flusher class"""
+    def setUp(self):
+        """Count the calls to the write function"""
+        self.writes = 0
+
+    def write(self):
+        """Stands in for the write function"""
+        self.writes += 1
+
+    def test_batch(self):
+        """Test that a full batch is written once without waiting"""
+        f = Flusher(self.write, 60, 3)
+        handles = [f.submit() for i in range(3)]
+        for handle in handles:
+            self.assertTrue(handle.wait(5))
+        self.assertEqual(self.writes, 1)
+
+    def test_interval(self):
+        """Test that the saves of one interval are written together"""
+        f = Flusher(self.write, 0.05, 1000)
+        handles = [f.submit() for i in range(10)]
+        self.assertTrue(handles[-1].wait(5))
+        self.assertTrue(all(handle.done for handle in handles))
+        self.assertLess(self.writes, 10)
+
+    def test_submit_after_idle(self):
+        """Test that a save queued once the thread went idle is written"""
+        f = Flusher(self.write, 0.05, 100)
+        self.assertTrue(f.submit().wait(2))
+        time.sleep(0.2)
+        self.assertTrue(f.submit().wait(2))
+        self.assertEqual(self.writes, 2)
+
+    def test_flush(self):
+        """Test that flush writes the waiting saves right away"""
+        f = Flusher(self.write, 60, 1000)
+        handle = f.submit()
+        self.assertFalse(handle.done)
+        f.flush()
+        self.assertTrue(handle.done)
+        self.assertEqual(self.writes, 1)
+
+    def test_flush_error(self):
+        """Test that a failed write reaches the handles, or the caller of
+        flush when no handle was waiting"""
+        def fail():
+            """Fails like a full disk"""
+            raise OSError("disk full")
+
+        f = Flusher(fail, 60, 1000)
+        handle = f.submit()
+        f.flush()
+        self.assertRaises(OSError, handle.wait)
+        self.assertRaises(OSError, f.flush)
+
+    def test_threads(self):
+        """Test that saves from many threads are all written"""
+        f = Flusher(self.write, 0.01, 50)
+        handles = []
+
+        def submit():
+            """Submits a few saves"""
+            for i in range(100):
+                handles.append(f.submit())
+
+        threads = [threading.Thread(target=submit) for i in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        for handle in handles:
+            self.assertTrue(handle.wait(5))
+        self.assertLess(self.writes, 400)
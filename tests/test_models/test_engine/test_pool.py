@@ -0,0 +1,115 @@
+#!/usr/bin/python3
+"""
+Contains the TestTimedQueuePoolDocs and TestTimedQueuePool classes
+"""
+
+import inspect
+from models.engine import pool
+import os
+import pep8
+import sqlalchemy
+import tempfile
+import threading
+import time
+import unittest
+TimedQueuePool = pool.TimedQueuePool
+
+
+class TestTimedQueuePoolDocs(unittest.TestCase):
+    """Tests to check the documentation and style of TimedQueuePool"""
+    @classmethod
+    def setUpClass(cls):
+        """Set up for the doc tests"""
+        cls.pool_f = [func for func in inspect.getmembers(
+            TimedQueuePool, inspect.isfunction)
+            if func[1].__qualname__.startswith("TimedQueuePool.")]
+
+    def test_pep8_conformance_pool(self):
+        """Test that models/engine/pool.py conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['models/engine/pool.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_pep8_conformance_test_pool(self):
+        """Test tests/test_models/test_engine/test_pool.py conforms"""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['tests/test_models/test_engine/\
+test_pool.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_pool_module_docstring(self):
+        """Test for the pool.py module docstring"""
+        self.assertIsNot(pool.__doc__, None, "pool.py needs a docstring")
+
+    def test_pool_class_docstring(self):
+        """Test for the TimedQueuePool class docstring"""
+        self.assertIsNot(TimedQueuePool.__doc__, None,
+                         "TimedQueuePool class needs a docstring")
+
+    def test_pool_func_docstrings(self):
+        """Test for the presence of docstrings in TimedQueuePool methods"""
+        for func in self.pool_f:
+            self.assertIsNot(func[1].__doc__, None,
+                             "{:s} method needs a docstring".format(func[0]))
+
+
+class TestTimedQueuePool(unittest.TestCase):
+    """Test the TimedQueuePool class"""
+    def setUp(self):
+        """Create an engine with a single connection and no overflow"""
+        self.tmp = tempfile.TemporaryDirectory()
+        self.engine = sqlalchemy.create_engine(
+            "sqlite:///" + os.path.join(self.tmp.name, "pool.db"),
+            poolclass=TimedQueuePool, pool_size=1, max_overflow=0,
+            pool_timeout=0.2)
+
+    def tearDown(self):
+        """Drop the engine and its database"""
+        self.engine.dispose()
+        self.tmp.cleanup()
+
+    def test_checked_out(self):
+        """Test that the stats follow the connections checked out"""
+        stats = self.engine.pool.stats()
+        self.assertEqual(stats["size"], 1)
+        self.assertEqual(stats["checked_out"], 0)
+        self.assertEqual(stats["checkouts"], 0)
+        with self.engine.connect():
+            stats = self.engine.pool.stats()
+            self.assertEqual(stats["checked_out"], 1)
+            self.assertEqual(stats["checkouts"], 1)
+        stats = self.engine.pool.stats()
+        self.assertEqual(stats["checked_out"], 0)
+        self.assertEqual(stats["checked_in"], 1)
+        self.assertEqual(stats["overflow"], 0)
+
+    def test_wait(self):
+        """Test that a checkout waiting for a connection is timed"""
+        connection = self.engine.connect()
+
+        def give_back():
+            """Gives the connection back after a while"""
+            time.sleep(0.1)
+            connection.close()
+
+        thread = threading.Thread(target=give_back)
+        thread.start()
+        with self.engine.connect():
+            pass
+        thread.join()
+        stats = self.engine.pool.stats()
+        self.assertEqual(stats["checkouts"], 2)
+        self.assertGreaterEqual(stats["wait_max"], 0.05)
+        self.assertGreaterEqual(stats["wait_total"], stats["wait_max"])
+        self.assertEqual(stats["timeouts"], 0)
+
+    def test_timeout(self):
+        """Test that checkouts giving up are counted"""
+        with self.engine.connect():
+            with self.assertRaises(sqlalchemy.exc.TimeoutError):
+                self.engine.connect()
+        stats = self.engine.pool.stats()
+        self.assertEqual(stats["timeouts"], 1)
+        self.assertGreaterEqual(stats["wait_max"], 0.2)
@@ -0,0 +1,104 @@
+#!/usr/bin/python3
+"""
+Contains the TestReadWriteLockDocs and TestReadWriteLock classes
+"""
+
+import inspect
+from models.engine import rwlock
+import pep8
+import threading
+import time
+import unittest
+ReadWriteLock = rwlock.ReadWriteLock
+
+
+class TestReadWriteLockDocs(unittest.TestCase):
+    """Tests to check the documentation and style of ReadWriteLock class"""
+    @classmethod
+    def setUpClass(cls):
+        """Set up for the doc tests"""
+        cls.rw_f = inspect.getmembers(ReadWriteLock, inspect.isfunction)
+
+    def test_pep8_conformance_rwlock(self):
+        """Test that models/engine/rwlock.py conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['models/engine/rwlock.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_pep8_conformance_test_rwlock(self):
+        """Test tests/test_models/test_engine/test_rwlock.py conforms"""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['tests/test_models/test_engine/\
+test_rwlock.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_rwlock_module_docstring(self):
+        """Test for the rwlock.py module docstring"""
+        self.assertIsNot(rwlock.__doc__, None,
+                         "rwlock.py needs a docstring")
+        self.assertTrue(len(rwlock.__doc__) >= 1,
+                        "rwlock.py needs a docstring")
+
+    def test_rwlock_func_docstrings(self):
+        """Test for the presence of docstrings in ReadWriteLock methods"""
+        for func in self.rw_f:
+            self.assertIsNot(func[1].__doc__, None,
+                             "{:s} method needs a docstring".format(func[0]))
+
+
+class TestReadWriteLock(unittest.TestCase):
+    """Test the ReadWriteLock class"""
+    def test_readers_share(self):
+        """Test that two threads can hold the read side together"""
+        lock = ReadWriteLock()
+        inside = threading.Barrier(2, timeout=5)
+
+        def read():
+            """Waits inside the lock for the other reader"""
+            with lock.read():
+                inside.wait()
+
+        thread = threading.Thread(target=read)
+        thread.start()
+        read()
+        thread.join()
+
+    def test_writer_excludes_readers(self):
+        """Test that a reader waits for the writer to leave"""
+        lock = ReadWriteLock()
+        events = []
+
+        def read():
+            """Records when the read side was obtained"""
+            with lock.read():
+                events.append("read")
+
+        with lock.write():
+            thread = threading.Thread(target=read)
+            thread.start()
+            time.sleep(0.05)
+            events.append("written")
+        thread.join()
+        self.assertEqual(events, ["written", "read"])
+
+    def test_reentrant(self):
+        """Test that the writer may read and both sides nest"""
+        lock = ReadWriteLock()
+        with lock.write():
+            with lock.write():
+                with lock.read():
+                    with lock.read():
+                        pass
+        with lock.read():
+            with lock.read():
+                pass
+        with lock.write():
+            pass
+
+    def test_no_upgrade(self):
+        """Test that a reader cannot take the write side"""
+        lock = ReadWriteLock()
+        with lock.read():
+            self.assertRaises(RuntimeError, lock.acquire_write)
@@ -0,0 +1,96 @@
+#!/usr/bin/python3
+"""
+Contains the TestSQLiteStorageDocs and TestSQLiteStorage classes
+"""
+
+import inspect
+import models
+from models.engine import sqlite_storage
+from models.city import City
+from models.state import State
+import pep8
+import sqlalchemy
+import unittest
+SQLiteStorage = sqlite_storage.SQLiteStorage
+
+
+class TestSQLiteStorageDocs(unittest.TestCase):
+    """Tests to check the documentation and style of SQLiteStorage class"""
+    @classmethod
+    def setUpClass(cls):
+        """Set up for the doc tests"""
+        cls.sqs_f = inspect.getmembers(SQLiteStorage, inspect.isfunction)
+
+    def test_pep8_conformance_sqlite_storage(self):
+        """Test that models/engine/sqlite_storage.py conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['models/engine/sqlite_storage.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_pep8_conformance_test_sqlite_storage(self):
+        """Test tests/test_models/test_sqlite_storage.py conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['tests/test_models/test_engine/\
+test_sqlite_storage.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_sqlite_storage_module_docstring(self):
+        """Test for the sqlite_storage.py module docstring"""
+        self.assertIsNot(sqlite_storage.__doc__, None,
+                         "sqlite_storage.py needs a docstring")
+
+    def test_sqlite_storage_class_docstring(self):
+        """Test for the SQLiteStorage class docstring"""
+        self.assertIsNot(SQLiteStorage.__doc__, None,
+                         "SQLiteStorage class needs a docstring")
+
+    def test_sqs_func_docstrings(self):
+        """Test for the presence of docstrings in SQLiteStorage methods"""
+        for func in self.sqs_f:
+            self.assertIsNot(func[1].__doc__, None,
+                             "{:s} method needs a docstring".format(func[0]))
+
+
+@unittest.skipIf(models.storage_name != 'sqlite', "not testing sqlite")
+class TestSQLiteStorage(unittest.TestCase):
+    """Test the SQLiteStorage class"""
+    def query(self, sql):
+        """Runs sql on a connection of the storage"""
+        engine = models.storage._DBStorage__engine
+        with engine.connect() as connection:
+            return connection.execute(sqlalchemy.text(sql)).fetchall()
+
+    def test_journal_mode(self):
+        """Test that file databases use the write-ahead log"""
+        mode = self.query("PRAGMA journal_mode")[0][0]
+        self.assertIn(mode, ("wal", "memory"))
+
+    def test_foreign_key_indexes(self):
+        """Test that the foreign keys are indexed"""
+        indexes = [row[0] for row in self.query(
+            "SELECT name FROM sqlite_master WHERE type = 'index'")]
+        for index in ("ix_cities_state_id", "ix_places_city_id",
+                      "ix_places_user_id", "ix_reviews_place_id",
+                      "ix_reviews_user_id", "ix_place_amenity_amenity_id"):
+            self.assertIn(index, indexes)
+
+    def test_foreign_keys(self):
+        """Test that a city cannot point to a missing state"""
+        models.storage.new(City(name="Nowhere", state_id="missing"))
+        with self.assertRaises(sqlalchemy.exc.IntegrityError):
+            models.storage.save()
+        models.storage._DBStorage__session.rollback()
+
+    def test_contract(self):
+        """Test new, save, get, count and delete together"""
+        before = models.storage.count(State)
+        state = State(name="California")
+        state.save()
+        self.assertIs(models.storage.get(State, state.id), state)
+        self.assertEqual(models.storage.count(State), before + 1)
+        models.storage.delete(state)
+        models.storage.save()
+        self.assertIsNone(models.storage.get(State, state.id))
+        self.assertEqual(models.storage.count(State), before)
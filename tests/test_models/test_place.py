@@ -7,6 +7,7 @@ from datetime import datetime
 import inspect
 import models
 from models import place
+from models.amenity import Amenity
 from models.base_model import BaseModel
 import pep8
 import unittest
@@ -171,6 +172,28 @@ class TestPlace(unittest.TestCase):
         self.assertEqual(type(place.amenity_ids), list)
         self.assertEqual(len(place.amenity_ids), 0)
 
+    @unittest.skipIf(models.storage_t == 'db', "not testing File Storage")
+    def test_amenity_ids_not_shared(self):
+        """Test that every Place has its own list of amenity ids"""
+        place = Place()
+        place.amenity_ids.append("id")
+        self.assertEqual(Place().amenity_ids, [])
+        self.assertEqual(Place.amenity_ids, [])
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing File Storage")
+    def test_amenities(self):
+        """Test that amenities lists the Amenity objects of amenity_ids"""
+        amenity = Amenity()
+        models.storage.new(amenity)
+        place = Place()
+        place.amenities = amenity
+        place.amenities = amenity
+        place.amenities = "not an Amenity"
+        self.assertEqual(place.amenity_ids, [amenity.id])
+        self.assertEqual(place.amenities, [amenity])
+        models.storage.delete(amenity)
+        self.assertEqual(place.amenities, [])
+
     def test_to_dict_creates_dict(self):
         """test to_dict method creates a dictionary with proper attrs"""
         p = Place()